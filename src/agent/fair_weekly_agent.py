@@ -13,14 +13,34 @@ from fairlib import (
     Message,
 )
 
+from src.tools.history_store import prompt_cache_key
+from src.tools.optimizer import (
+    format_schedule,
+    parse_schedule_text,
+    plan_week,
+    warm_start_deltas,
+)
+
 DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 DAY_HEADERS = {d + ":" for d in DAYS}
 
+# Cached LLM output older than this (seconds) is regenerated
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+
 
 class FairWeeklyAgent:
-    def __init__(self, min_sleep: int = 8):
+    def __init__(self, min_sleep: int = 8, response_cache=None, cache_ttl=DEFAULT_CACHE_TTL):
+        """
+        response_cache: optional object with cache_get(key, max_age) / cache_put(key, text)
+        (e.g. ScheduleHistoryStore) used to reuse raw LLM output for identical
+        prompts. Off unless given; entries older than cache_ttl seconds are ignored.
+        """
         self.min_sleep = min_sleep
         self.weekly_events = {d: [] for d in DAYS}
+        self.response_cache = response_cache
+        self.cache_ttl = cache_ttl
+        self.last_raw_output = None
+        self.prior_schedule = None
 
         # --------------------------
         # 1. Build LLM brain
@@ -60,6 +80,23 @@ class FairWeeklyAgent:
         """
         self.weekly_events = events_dict
 
+    def set_prior_schedule(self, schedule_text):
+        """
+        Warm start from last week's accepted schedule. If no event changed,
+        run_weekly_cycle() skips the LLM; otherwise the prior week is put in
+        the prompt as a compact reference.
+        """
+        self.prior_schedule = parse_schedule_text(schedule_text) if schedule_text else None
+
+    def _prior_reference(self) -> str:
+        lines = []
+        for day in DAYS:
+            blocks = self.prior_schedule.get(day, [])
+            if blocks:
+                items = "; ".join(f"{s}-{e} {act}" for s, e, act in blocks)
+                lines.append(f"{day[:3]}: {items}")
+        return "\n".join(lines)
+
     # --------------------------------------------------------
     # Prompt Builder
     # --------------------------------------------------------
@@ -74,6 +111,14 @@ class FairWeeklyAgent:
 
         event_block = "\n".join(event_lines)
 
+        prior_block = ""
+        if self.prior_schedule:
+            prior_block = (
+                "\nLast week's accepted schedule (keep these times for unchanged tasks):\n"
+                + self._prior_reference()
+                + "\n"
+            )
+
         prompt = f"""
 You MUST output a valid weekly schedule.
 
@@ -90,7 +135,7 @@ RULES:
 
 User Events:
 {event_block}
-
+{prior_block}
 FORMAT TO FOLLOW EXACTLY:
 
 Monday:
@@ -201,12 +246,31 @@ ONLY output the schedule in this format.
     # --------------------------------------------------------
     # Main execution
     # --------------------------------------------------------
-    def run_weekly_cycle(self) -> str:
+    def run_weekly_cycle(self, use_cache: bool = True) -> str:
+        """use_cache=False forces a fresh LLM call (the new output is still cached)."""
+        # Warm start: an unchanged week is re-planned deterministically
+        if self.prior_schedule and not warm_start_deltas(self.weekly_events, self.prior_schedule):
+            self.last_raw_output = None
+            planned = plan_week(self.weekly_events, self.min_sleep, prior=self.prior_schedule)
+            return format_schedule(planned)
+
         prompt = self._build_prompt()
-        messages = [Message(role="user", content=prompt)]
+        cache_key = prompt_cache_key(prompt)
+
+        result = None
+        if self.response_cache is not None and use_cache:
+            result = self.response_cache.cache_get(cache_key, max_age=self.cache_ttl)
+
+        if result is None:
+            messages = [Message(role="user", content=prompt)]
+
+            # SimpleAgent is async → use asyncio.run on .arun(...)
+            result = asyncio.run(self.agent.arun(messages))
+
+            if self.response_cache is not None:
+                self.response_cache.cache_put(cache_key, result)
 
-        # SimpleAgent is async → use asyncio.run on .arun(...)
-        result = asyncio.run(self.agent.arun(messages))
+        self.last_raw_output = result
 
         cleaned = self._clean_output(result)
         fixed = self._fix_schedule(cleaned)
@@ -1,9 +1,15 @@
 import re
-from transformers import AutoTokenizer, AutoModelForCausalLM
+from threading import Thread
+from transformers import AutoTokenizer, AutoModelForCausalLM, TextIteratorStreamer
 import torch
 
+from src.tools.stream_parser import StreamingScheduleParser
+
 DAYS = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
 
+# Seconds to wait for the next streamed token before giving up
+STREAM_TOKEN_TIMEOUT = 300
+
 # --------------------------------------------------------------------
 # Helper formatting functions
 # --------------------------------------------------------------------
@@ -168,27 +174,75 @@ Now generate the schedule.
     # ----------------------------------------------------------
     # Run Phi-3.5 and generate text
     # ----------------------------------------------------------
-    def call_model(self, prompt: str):
+    def call_model(self, prompt: str, on_block=None):
+        """
+        If on_block is given, decoding is streamed and on_block(block) is
+        called with each (day, start, end, activity) as soon as its line
+        completes. The full text is returned either way.
+        """
         inputs = self.tokenizer(prompt, return_tensors="pt")
-        output = self.model.generate(
-            **inputs,
-            max_new_tokens=900,
-            temperature=0.4,
-            do_sample=True,
+
+        if on_block is None:
+            output = self.model.generate(
+                **inputs,
+                max_new_tokens=900,
+                temperature=0.4,
+                do_sample=True,
+            )
+            return self.tokenizer.decode(output[0], skip_special_tokens=True)
+
+        # timeout: give up if no token arrives for this long instead of hanging
+        streamer = TextIteratorStreamer(
+            self.tokenizer, skip_prompt=True, skip_special_tokens=True,
+            timeout=STREAM_TOKEN_TIMEOUT,
         )
-        return self.tokenizer.decode(output[0], skip_special_tokens=True)
+        errors = []
+
+        def generate():
+            try:
+                self.model.generate(
+                    **inputs,
+                    max_new_tokens=900,
+                    temperature=0.4,
+                    do_sample=True,
+                    streamer=streamer,
+                )
+            except Exception as e:
+                errors.append(e)
+            finally:
+                # always unblock the consumer loop below
+                streamer.end()
+
+        worker = Thread(target=generate, daemon=True)
+        worker.start()
+
+        parser = StreamingScheduleParser()
+        chunks = []
+        for chunk in streamer:
+            chunks.append(chunk)
+            for block in parser.feed(chunk):
+                on_block(block)
+
+        worker.join()
+        if errors:
+            raise errors[0]
+
+        for block in parser.close():
+            on_block(block)
+        return prompt + "".join(chunks)
 
     # ----------------------------------------------------------
     # MAIN PIPELINE
     # ----------------------------------------------------------
-    def run_weekly_cycle(self):
+    def run_weekly_cycle(self, on_block=None):
+        """on_block: optional callback fed each block while decoding runs."""
         print("Running schedule generation...")
 
         # Step 1: Build prompt
         prompt = self.build_prompt()
 
-        # Step 2: Call model
-        raw_output = self.call_model(prompt)
+        # Step 2: Call model (streamed when a block callback is given)
+        raw_output = self.call_model(prompt, on_block=on_block)
 
         print("\nRAW MODEL OUTPUT:")
         print(raw_output[:5000])  # preview
@@ -0,0 +1,211 @@
+# src/tools/async_calendar.py
+
+"""
+Asyncio Google Calendar v3 client.
+
+Talks to the REST API directly through one pooled httpx.AsyncClient so
+hundreds of users' syncs can run concurrently on one event loop instead
+of blocking on googleapiclient's synchronous execute().
+
+Every request first takes a token from the client's own TokenBucket,
+sized to Calendar's per-user quota, and from an optional shared
+project-level bucket; 403 rate-limit / 429 / 5xx responses are retried
+with exponential backoff and full jitter, honoring Retry-After.
+
+    async with AsyncCalendarClient(credentials=creds) as cal:
+        created = await cal.create_events(bodies)
+
+base_url can point at a local fake server (see fake_calendar_server).
+"""
+
+import asyncio
+import random
+import time
+from urllib.parse import quote
+
+import httpx
+
+DEFAULT_BASE_URL = "https://www.googleapis.com/calendar/v3/"
+
+# Calendar's default per-user quota is 600 requests/minute
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 20
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, up to `capacity` banked."""
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=DEFAULT_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens=1):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+def _is_retryable(response):
+    if response.status_code == 403:
+        # only quota errors are transient; permission errors are not
+        return "ratelimitexceeded" in response.text.lower()
+    return response.status_code in RETRY_STATUSES
+
+
+class AsyncCalendarClient:
+    """
+    credentials: google-auth credentials (refreshed when expired), or
+    token:       a bare bearer token (e.g. for a fake server).
+    limiter:         this user's TokenBucket (default: a new per-user bucket).
+    project_limiter: optional TokenBucket shared by all clients of a project.
+    http:        httpx.AsyncClient to share a connection pool across clients.
+    """
+
+    def __init__(self, credentials=None, token=None, base_url=DEFAULT_BASE_URL,
+                 calendar_id="primary", limiter=None, project_limiter=None, http=None,
+                 max_connections=100, timeout=30.0,
+                 max_retries=5, backoff=0.5, max_backoff=32.0):
+        self.credentials = credentials
+        self.token = token
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.calendar_id = calendar_id
+        self.limiter = limiter or TokenBucket()
+        self.project_limiter = project_limiter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._owns_http = http is None
+        self.http = http or httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._owns_http:
+            await self.http.aclose()
+
+    # --------------------------------------------------------
+    # Transport
+    # --------------------------------------------------------
+    async def _auth_headers(self):
+        creds = self.credentials
+        if creds is None:
+            return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+        if creds.expired:
+            # imported here so bare-token use doesn't need googleapiclient
+            from src.tools.google_calendar_api import ensure_fresh
+            await asyncio.to_thread(ensure_fresh, creds)
+        return {"Authorization": f"Bearer {creds.token}"}
+
+    def _delay(self, attempt, response):
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def request(self, method, path, params=None, json=None):
+        """One API call with quota limiting and backoff. Returns parsed JSON (or None)."""
+        url = self.base_url + path
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            if self.project_limiter is not None:
+                await self.project_limiter.acquire()
+            response = await self.http.request(
+                method, url, params=params, json=json, headers=await self._auth_headers()
+            )
+            if attempt < self.max_retries and _is_retryable(response):
+                await asyncio.sleep(self._delay(attempt, response))
+                continue
+
+            response.raise_for_status()
+            if response.status_code == 204 or not response.content:
+                return None
+            return response.json()
+
+    # --------------------------------------------------------
+    # Events
+    # --------------------------------------------------------
+    def _events_path(self, event_id=None):
+        # ids like "en.usa#holiday@group.v.calendar.google.com" must be escaped
+        path = f"calendars/{quote(self.calendar_id, safe='')}/events"
+        return f"{path}/{quote(event_id, safe='')}" if event_id else path
+
+    async def insert_event(self, body):
+        return await self.request("POST", self._events_path(), json=body)
+
+    async def patch_event(self, event_id, body):
+        return await self.request("PATCH", self._events_path(event_id), json=body)
+
+    async def delete_event(self, event_id):
+        return await self.request("DELETE", self._events_path(event_id))
+
+    async def iter_events(self, **params):
+        """Async generator over every matching event, following nextPageToken."""
+        while True:
+            page = await self.request("GET", self._events_path(), params=params)
+            for event in page.get("items", []):
+                yield event
+            if not page.get("nextPageToken"):
+                return
+            params = dict(params, pageToken=page["nextPageToken"])
+
+    async def free_busy(self, body):
+        return await self.request("POST", "freeBusy", json=body)
+
+    async def create_events(self, bodies):
+        """
+        Insert many events concurrently (bounded by the limiter and pool).
+        Returns one result per body: the created event or the exception.
+        """
+        return await asyncio.gather(
+            *(self.insert_event(body) for body in bodies), return_exceptions=True
+        )
+
+
+async def sync_users(user_events, base_url=DEFAULT_BASE_URL, rate=DEFAULT_RATE,
+                     burst=DEFAULT_BURST, project_rate=None, max_connections=100):
+    """
+    Insert many users' events concurrently over one connection pool. Each
+    user gets their own quota bucket (`rate` req/s); project_rate, if set,
+    caps the combined rate with one shared bucket.
+
+    user_events: {user_id: (credentials_or_token, [event body, ...])}
+    Returns {user_id: [created event or exception, ...]}.
+    """
+    project_limiter = TokenBucket(project_rate, max(burst, project_rate)) if project_rate else None
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as http:
+        async def run(auth, bodies):
+            auth_kw = {"token": auth} if isinstance(auth, str) else {"credentials": auth}
+            client = AsyncCalendarClient(
+                base_url=base_url, limiter=TokenBucket(rate, burst),
+                project_limiter=project_limiter, http=http, **auth_kw,
+            )
+            return await client.create_events(bodies)
+
+        users = list(user_events)
+        results = await asyncio.gather(*(run(*user_events[u]) for u in users))
+    return dict(zip(users, results))
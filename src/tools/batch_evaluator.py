@@ -0,0 +1,234 @@
+# src/tools/batch_evaluator.py
+
+"""
+Vectorized evaluator for many candidate schedules at once.
+
+Each schedule is parsed once, then every block of every schedule is
+packed into flat NumPy arrays (schedule index, day index, start/end
+minutes, label id). The metrics from evaluator.py are computed as
+array operations over those columns, which is what best-of-N
+selection, regression corpora and history analytics need.
+
+Results match evaluate_schedule() for each schedule, except that
+required tasks are matched against the activity label rather than the
+whole 'HH:MM-HH:MM-Label' line.
+"""
+
+import numpy as np
+
+from src.tools.evaluator import (
+    DAYS,
+    extract_day_blocks,
+    parse_block_minutes,
+)
+
+DAY_INDEX = {d: i for i, d in enumerate(DAYS)}
+
+
+# -----------------------------------------------------------
+# Packing
+# -----------------------------------------------------------
+
+def pack_schedules(schedule_texts):
+    """
+    Parse every schedule once and return a dict of columns:
+
+        sched     (n_blocks,)  int32   schedule index
+        day       (n_blocks,)  int8    index into DAYS
+        start     (n_blocks,)  int16   start minute of day
+        end       (n_blocks,)  int16   end minute of day
+        label_id  (n_blocks,)  int32   index into labels
+        is_sleep  (n_blocks,)  bool    line contains '-Sleep'
+        days_seen (n, 7)       bool    day header present
+        day_rank  (n, 7)       int8    header order within the schedule
+        labels    list[str]
+    """
+    sched, day, start, end, label_id, is_sleep = [], [], [], [], [], []
+    label_ids = {}
+
+    n = len(schedule_texts)
+    days_seen = np.zeros((n, len(DAYS)), dtype=bool)
+    day_rank = np.full((n, len(DAYS)), len(DAYS), dtype=np.int8)
+
+    for s, text in enumerate(schedule_texts):
+        parsed = extract_day_blocks(text)
+
+        for rank, (day_name, blocks) in enumerate(parsed.items()):
+            d = DAY_INDEX[day_name]
+            days_seen[s, d] = True
+            day_rank[s, d] = rank
+
+            for blk in blocks:
+                st, en, label = parse_block_minutes(blk)
+                if st is None:
+                    continue
+
+                sched.append(s)
+                day.append(d)
+                start.append(st)
+                end.append(en)
+                label_id.append(label_ids.setdefault(label, len(label_ids)))
+                is_sleep.append("-Sleep" in blk)
+
+    return {
+        "sched": np.asarray(sched, dtype=np.int32),
+        "day": np.asarray(day, dtype=np.int8),
+        "start": np.asarray(start, dtype=np.int16),
+        "end": np.asarray(end, dtype=np.int16),
+        "label_id": np.asarray(label_id, dtype=np.int32),
+        "is_sleep": np.asarray(is_sleep, dtype=bool),
+        "days_seen": days_seen,
+        "day_rank": day_rank,
+        "labels": list(label_ids),
+    }
+
+
+def block_durations(packed):
+    """Hours per block, rolling past midnight like metric_sleep_hours."""
+    minutes = (packed["end"].astype(np.int32) - packed["start"]) % 1440
+    return minutes / 60.0
+
+
+# -----------------------------------------------------------
+# Vectorized metrics
+# -----------------------------------------------------------
+
+def _day_completeness(packed):
+    return packed["days_seen"].all(axis=1)
+
+
+def _sleep_violations(packed, durations, min_sleep):
+    return packed["is_sleep"] & (durations < min_sleep)
+
+
+def _day_totals(packed, durations, n):
+    key = packed["sched"].astype(np.int64) * len(DAYS) + packed["day"]
+    totals = np.bincount(key, weights=durations, minlength=n * len(DAYS))
+    return totals.reshape(n, len(DAYS))
+
+
+def _task_presence(packed, user_events_list, n):
+    """
+    Returns (req_sched, req_day_names, req_task, found, task_names) where
+    each required (schedule, day, task) triple has a found flag. Days not in
+    DAYS can never be satisfied, as in metric_activity_preservation.
+    """
+    task_ids = {}
+    req_sched, req_day, req_day_names, req_task = [], [], [], []
+
+    for s, user_events in enumerate(user_events_list):
+        for day_name, task_list in user_events.items():
+            d = DAY_INDEX.get(day_name, -1)
+            for task, _ in task_list:
+                req_sched.append(s)
+                req_day.append(d)
+                req_day_names.append(day_name)
+                req_task.append(task_ids.setdefault(task, len(task_ids)))
+
+    req_sched = np.asarray(req_sched, dtype=np.int64)
+    req_day = np.asarray(req_day, dtype=np.int64)
+    req_task = np.asarray(req_task, dtype=np.int64)
+    found = np.zeros(len(req_task), dtype=bool)
+
+    if len(req_task) == 0 or len(packed["label_id"]) == 0:
+        return req_sched, req_day_names, req_task, found, list(task_ids)
+
+    labels = packed["labels"]
+    block_key = packed["sched"].astype(np.int64) * len(DAYS) + packed["day"]
+    req_key = req_sched * len(DAYS) + req_day
+    valid = req_day >= 0
+
+    # One substring pass per (task, distinct label), then pure array lookups.
+    for task, t in task_ids.items():
+        label_match = np.fromiter((task in lbl for lbl in labels), dtype=bool, count=len(labels))
+        hit = label_match[packed["label_id"]]
+        present = np.bincount(block_key[hit], minlength=n * len(DAYS)) > 0
+
+        rows = valid & (req_task == t)
+        found[rows] = present[req_key[rows]]
+
+    return req_sched, req_day_names, req_task, found, list(task_ids)
+
+
+# -----------------------------------------------------------
+#  MAIN BATCH FUNCTION
+# -----------------------------------------------------------
+
+def evaluate_many(schedule_texts, user_events, min_sleep=8, as_arrays=False):
+    """
+    Evaluate many schedules at once.
+
+    user_events: one events dict shared by every schedule (best-of-N),
+                 or a list with one events dict per schedule.
+
+    Returns a list of result dicts in the evaluate_schedule() format, or,
+    with as_arrays=True, a dict of per-schedule boolean ok arrays:
+        {"day_completeness": (n,), "sleep_requirement": (n,), ...}
+    """
+    schedule_texts = list(schedule_texts)
+    n = len(schedule_texts)
+
+    if isinstance(user_events, dict):
+        user_events_list = [user_events] * n
+    else:
+        user_events_list = list(user_events)
+        if len(user_events_list) != n:
+            raise ValueError("user_events must be a dict or one dict per schedule")
+
+    packed = pack_schedules(schedule_texts)
+    durations = block_durations(packed)
+
+    days_ok = _day_completeness(packed)
+
+    sleep_bad = _sleep_violations(packed, durations, min_sleep)
+    sleep_ok = np.bincount(packed["sched"][sleep_bad], minlength=n) == 0
+
+    totals = _day_totals(packed, durations, n)
+    over_24 = totals > 24
+    hours_ok = ~over_24.any(axis=1)
+
+    req_sched, req_day_names, req_task, found, task_names = _task_presence(
+        packed, user_events_list, n
+    )
+    tasks_ok = np.bincount(req_sched[~found], minlength=n) == 0
+
+    if as_arrays:
+        return {
+            "day_completeness": days_ok,
+            "sleep_requirement": sleep_ok,
+            "max_24_hours": hours_ok,
+            "task_preservation": tasks_ok,
+        }
+
+    # Expand the detail lists only for schedules that actually failed.
+    results = []
+    for s in range(n):
+        missing_days = [] if days_ok[s] else [
+            d for i, d in enumerate(DAYS) if not packed["days_seen"][s, i]
+        ]
+        results.append({
+            "day_completeness": {"ok": bool(days_ok[s]), "missing_days": missing_days},
+            "sleep_requirement": {"ok": bool(sleep_ok[s]), "violations": []},
+            "max_24_hours": {"ok": bool(hours_ok[s]), "violations": []},
+            "task_preservation": {"ok": bool(tasks_ok[s]), "missing_tasks": []},
+        })
+
+    for i in np.flatnonzero(sleep_bad):
+        s = packed["sched"][i]
+        results[s]["sleep_requirement"]["violations"].append(
+            (DAYS[packed["day"][i]], float(durations[i]))
+        )
+
+    for s in np.flatnonzero(~hours_ok):
+        bad_days = sorted(np.flatnonzero(over_24[s]), key=lambda d: packed["day_rank"][s, d])
+        results[s]["max_24_hours"]["violations"] = [
+            (DAYS[d], float(totals[s, d])) for d in bad_days
+        ]
+
+    # Requirements were recorded in user_events order, so this keeps it.
+    for i in np.flatnonzero(~found):
+        results[req_sched[i]]["task_preservation"]["missing_tasks"].append(
+            (req_day_names[i], task_names[req_task[i]])
+        )
+
+    return results
@@ -0,0 +1,155 @@
+# src/tools/columnar_export.py
+
+"""
+Columnar (Parquet/Arrow) export of stored schedule blocks.
+
+Flattens the history store into one row per block:
+    user, week, day, start_min, end_min, activity, <metric>_ok flags
+and writes it to Parquet one row group at a time, so analytics over
+years of weekly schedules can read only the columns they need.
+
+Rows are buffered in typed arrays and dictionary-encoded string codes
+rather than per-row dicts (cf. dashboard.parse_blocks), so memory stays
+bounded by the row group size.
+"""
+
+import json
+from array import array
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+# Metric flags copied onto every block of a run
+METRIC_FLAGS = [
+    "day_completeness",
+    "sleep_requirement",
+    "max_24_hours",
+    "task_preservation",
+]
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Parquet export needs pyarrow (pip install pyarrow)")
+
+
+def block_schema():
+    _require_pyarrow()
+    text = pa.dictionary(pa.int32(), pa.string())
+    fields = [
+        pa.field("user", text),
+        pa.field("week", text),
+        pa.field("day", pa.int8()),
+        pa.field("start_min", pa.int16()),
+        pa.field("end_min", pa.int16()),
+        pa.field("activity", text),
+    ]
+    fields += [pa.field(f"{name}_ok", pa.bool_()) for name in METRIC_FLAGS]
+    return pa.schema(fields)
+
+
+class _RowGroupBuffer:
+    """Typed column buffers for one row group."""
+
+    def __init__(self):
+        self.codes = {"user": array("i"), "week": array("i"), "activity": array("i")}
+        self.dicts = {"user": {}, "week": {}, "activity": {}}
+        self.day = array("b")
+        self.start_min = array("h")
+        self.end_min = array("h")
+        self.flags = {name: bytearray() for name in METRIC_FLAGS}
+
+    def __len__(self):
+        return len(self.day)
+
+    def _code(self, column, value):
+        lookup = self.dicts[column]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(lookup)
+        self.codes[column].append(code)
+
+    def append(self, user, week, day, start_min, end_min, activity, flags):
+        self._code("user", user)
+        self._code("week", week)
+        self._code("activity", activity)
+        self.day.append(day)
+        self.start_min.append(start_min)
+        self.end_min.append(end_min)
+        for name, ok in zip(METRIC_FLAGS, flags):
+            self.flags[name].append(1 if ok else 0)
+
+    def to_table(self, schema):
+        def text(column):
+            return pa.DictionaryArray.from_arrays(
+                pa.array(self.codes[column], type=pa.int32()),
+                pa.array(list(self.dicts[column]), type=pa.string()),
+            )
+
+        columns = [
+            text("user"),
+            text("week"),
+            pa.array(self.day, type=pa.int8()),
+            pa.array(self.start_min, type=pa.int16()),
+            pa.array(self.end_min, type=pa.int16()),
+            text("activity"),
+        ]
+        columns += [
+            pa.array(self.flags[name], type=pa.uint8()).cast(pa.bool_())
+            for name in METRIC_FLAGS
+        ]
+        return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _run_flags(store, run_id):
+    row = store.conn.execute(
+        "SELECT metrics_json FROM runs WHERE id = ?", (run_id,)
+    ).fetchone()
+    metrics = json.loads(row[0]) if row and row[0] else {}
+    return tuple(bool(metrics.get(name, {}).get("ok")) for name in METRIC_FLAGS)
+
+
+def export_history_parquet(store, path, user_id=None, since_week=None,
+                           until_week=None, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Stream blocks from a ScheduleHistoryStore into a Parquet file.
+    Only the latest run per (user, week) is exported. Returns the row count.
+    """
+    schema = block_schema()
+    total = 0
+    last_run, flags = None, None
+
+    with pq.ParquetWriter(path, schema) as writer:
+        buf = _RowGroupBuffer()
+
+        for run_id, user, week, day, start, end, activity in store.iter_blocks(
+            user_id=user_id, since_week=since_week, until_week=until_week
+        ):
+            # blocks arrive grouped by run, so one lookup per run
+            if run_id != last_run:
+                last_run, flags = run_id, _run_flags(store, run_id)
+
+            buf.append(user, week, day, start, end, activity, flags)
+
+            if len(buf) >= row_group_size:
+                writer.write_table(buf.to_table(schema), row_group_size=row_group_size)
+                total += len(buf)
+                buf = _RowGroupBuffer()
+
+        if len(buf):
+            writer.write_table(buf.to_table(schema), row_group_size=row_group_size)
+            total += len(buf)
+
+    return total
+
+
+def read_blocks_table(path, columns=None, filters=None):
+    """Read exported blocks back, touching only the requested columns."""
+    _require_pyarrow()
+    return pq.read_table(path, columns=columns, filters=filters)
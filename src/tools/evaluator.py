@@ -5,6 +5,8 @@ Generates reproducible quantitative metrics for your report.
 """
 
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 
@@ -33,6 +35,44 @@ def parse_time_block(block):
         return None, None, None
 
 
+_CLOCK_RE = re.compile(r"(\d{1,2}):(\d{1,2})")
+
+
+def clock_to_minutes(text):
+    """'07:30' -> 450. Returns None when the text is not a valid HH:MM."""
+    match = _CLOCK_RE.fullmatch(text)
+    if not match:
+        return None
+
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    if hours > 23 or minutes > 59:
+        return None
+    return hours * 60 + minutes
+
+
+def parse_block_minutes(block):
+    """
+    Integer-minute version of parse_time_block (no strptime).
+    Input: '07:00-09:00-Gym'
+    Output: (420, 540, 'Gym'), or (None, None, None) if malformed.
+    """
+    parts = block.split("-", 2)
+    if len(parts) < 3:
+        return None, None, None
+
+    start = clock_to_minutes(parts[0])
+    end = clock_to_minutes(parts[1])
+    if start is None or end is None:
+        return None, None, None
+
+    return start, end, parts[2].strip()
+
+
+def block_hours(start_min, end_min):
+    """Block length in hours; blocks ending before they start roll past midnight."""
+    return ((end_min - start_min) % 1440) / 60.0
+
+
 def extract_day_blocks(schedule_text):
     """
     Returns dictionary:
@@ -60,56 +100,71 @@ def extract_day_blocks(schedule_text):
 
 
 # -----------------------------------------------------------
-#  METRIC CALCULATION FUNCTIONS
+#  PER-DAY METRIC CONTRIBUTIONS
 # -----------------------------------------------------------
 
-def metric_day_completeness(schedule_text):
-    parsed = extract_day_blocks(schedule_text)
-    missing = [d for d in DAYS if d not in parsed]
-    return len(missing) == 0, missing
+def day_sleep_violations(day, blocks, min_sleep=8):
+    """Sleep blocks on one day that are shorter than min_sleep."""
+    violations = []
 
+    for blk in blocks:
+        if "-Sleep" in blk:
+            start, end, _ = parse_block_minutes(blk)
+            if start is None: continue
 
-def metric_sleep_hours(schedule_text, min_sleep=8):
-    parsed = extract_day_blocks(schedule_text)
-    violations = []
+            # handle rollover sleep (21:00 - 05:00)
+            duration = block_hours(start, end)
 
-    for day, blocks in parsed.items():
-        for blk in blocks:
-            if "-Sleep" in blk:
-                start, end, _ = parse_time_block(blk)
-                if start is None: continue
+            if duration < min_sleep:
+                violations.append((day, duration))
 
-                # handle rollover sleep (21:00 - 05:00)
-                duration = (end - start).seconds / 3600.0
-                if duration < 0:
-                    duration += 24
+    return violations
 
-                if duration < min_sleep:
-                    violations.append((day, duration))
 
-    return len(violations) == 0, violations
+def day_total_hours(blocks):
+    """Total scheduled hours on one day."""
+    total = 0
+    for blk in blocks:
+        start, end, _ = parse_block_minutes(blk)
+        if start is None: continue
 
+        total += block_hours(start, end)
 
-def metric_max_24_hours(schedule_text):
-    parsed = extract_day_blocks(schedule_text)
-    violations = []
+    return total
 
-    for day, blocks in parsed.items():
-        total = 0
-        for blk in blocks:
-            start, end, _ = parse_time_block(blk)
-            if not start: continue
 
-            duration = (end - start).seconds / 3600.0
-            if duration < 0:
-                duration += 24
+def day_missing_tasks(day, blocks, task_list):
+    """Required tasks for one day that do not appear in its blocks."""
+    missing = []
 
-            total += duration
+    for task, _ in task_list:
+        found = any(task in blk for blk in blocks)
+        if not found:
+            missing.append((day, task))
 
-        if total > 24:
-            violations.append((day, total))
+    return missing
+
+
+# -----------------------------------------------------------
+#  METRIC CALCULATION FUNCTIONS
+# -----------------------------------------------------------
 
-    return len(violations) == 0, violations
+# Thin wrappers over the registered metrics below, kept for callers that
+# want the old (ok, details) tuples.
+
+def metric_day_completeness(schedule_text):
+    result = evaluate_schedule(schedule_text, {}, metrics=["day_completeness"])
+    return result["day_completeness"]["ok"], result["day_completeness"]["missing_days"]
+
+
+def metric_sleep_hours(schedule_text, min_sleep=8):
+    result = evaluate_schedule(schedule_text, {}, min_sleep, metrics=["sleep_requirement"])
+    return result["sleep_requirement"]["ok"], result["sleep_requirement"]["violations"]
+
+
+def metric_max_24_hours(schedule_text):
+    result = evaluate_schedule(schedule_text, {}, metrics=["max_24_hours"])
+    return result["max_24_hours"]["ok"], result["max_24_hours"]["violations"]
 
 
 def metric_activity_preservation(schedule_text, user_events):
@@ -118,41 +173,327 @@ def metric_activity_preservation(schedule_text, user_events):
     user_events format:
     { "Monday": [("Gym",2), ("Work",8)], ... }
     """
-    parsed = extract_day_blocks(schedule_text)
+    result = evaluate_schedule(schedule_text, user_events, metrics=["task_preservation"])
+    return result["task_preservation"]["ok"], result["task_preservation"]["missing_tasks"]
+
+
+# -----------------------------------------------------------
+#  METRIC REGISTRY
+# -----------------------------------------------------------
+#
+# Metrics declare the parsed inputs they need; evaluate_schedule builds
+# each input at most once and only for the metrics that were requested.
+
+INPUTS = {}
+METRICS = {}
+
+DEFAULT_METRICS = []
+
+LATE_NIGHT_START = 23 * 60   # 23:00
+LATE_NIGHT_END = 5 * 60      # 05:00 next morning
+MIN_USEFUL_GAP = 30          # free gaps shorter than this count as fragmentation
+
+PARALLEL_WORKERS = 4         # threads in the shared pool used by parallel=True
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def register_input(name, requires=()):
+    """Register a parsed input builder: fn(ctx) -> value."""
+    def decorator(fn):
+        INPUTS[name] = {"fn": fn, "requires": tuple(requires)}
+        return fn
+    return decorator
+
+
+def register_metric(name, requires=("day_blocks",), default=True, expensive=False):
+    """
+    Register a metric: fn(ctx) -> result dict with at least an "ok" key.
+    ctx holds schedule_text, user_events, min_sleep and every declared input.
+    default:   run when the caller does not pick metrics explicitly
+    expensive: may be run on the shared pool when parallel=True
+    """
+    def decorator(fn):
+        METRICS[name] = {
+            "fn": fn,
+            "requires": tuple(requires),
+            "default": default,
+            "expensive": expensive,
+        }
+        if default:
+            DEFAULT_METRICS.append(name)
+        return fn
+    return decorator
+
+
+def _resolve_input(name, ctx):
+    if name in ctx:
+        return
+    if name not in INPUTS:
+        raise ValueError(f"Unknown metric input: {name}")
+
+    for dep in INPUTS[name]["requires"]:
+        _resolve_input(dep, ctx)
+    ctx[name] = INPUTS[name]["fn"](ctx)
+
+
+def _get_pool():
+    """The process-wide metric pool, created on first parallel evaluation."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=PARALLEL_WORKERS,
+                                           thread_name_prefix="metrics")
+    return _pool
+
+
+@register_input("day_blocks")
+def _input_day_blocks(ctx):
+    return extract_day_blocks(ctx["schedule_text"])
+
+
+@register_input("week_intervals", requires=("day_blocks",))
+def _input_week_intervals(ctx):
+    """
+    Every valid block on one week-long minute axis, sorted by start:
+    (abs_start, abs_end, day, label). Monday 00:00 is minute 0 and blocks
+    that roll past midnight spill into the next day.
+    """
+    intervals = []
+    for day, blocks in ctx["day_blocks"].items():
+        offset = DAYS.index(day) * 1440
+        for blk in blocks:
+            start, end, label = parse_block_minutes(blk)
+            if start is None: continue
+
+            abs_start = offset + start
+            intervals.append((abs_start, abs_start + (end - start) % 1440, day, label))
+
+    intervals.sort()
+    return intervals
+
+
+@register_metric("day_completeness")
+def _metric_day_completeness(ctx):
+    missing = [d for d in DAYS if d not in ctx["day_blocks"]]
+    return {"ok": len(missing) == 0, "missing_days": missing}
+
+
+@register_metric("sleep_requirement")
+def _metric_sleep_requirement(ctx):
+    violations = []
+    for day, blocks in ctx["day_blocks"].items():
+        violations.extend(day_sleep_violations(day, blocks, ctx["min_sleep"]))
+    return {"ok": len(violations) == 0, "violations": violations}
+
+
+@register_metric("max_24_hours")
+def _metric_max_24_hours(ctx):
+    violations = []
+    for day, blocks in ctx["day_blocks"].items():
+        total = day_total_hours(blocks)
+        if total > 24:
+            violations.append((day, total))
+    return {"ok": len(violations) == 0, "violations": violations}
+
+
+@register_metric("task_preservation")
+def _metric_task_preservation(ctx):
+    parsed = ctx["day_blocks"]
     missing = []
+    for day, task_list in ctx["user_events"].items():
+        missing.extend(day_missing_tasks(day, parsed.get(day, []), task_list))
+    return {"ok": len(missing) == 0, "missing_tasks": missing}
+
+
+@register_metric("overlaps", requires=("week_intervals",), default=False, expensive=True)
+def _metric_overlaps(ctx):
+    """Pairs of blocks that overlap in time: (day, label_a, label_b, minutes)."""
+    overlaps = []
+    active = []
+
+    for start, end, day, label in ctx["week_intervals"]:
+        active = [iv for iv in active if iv[1] > start]
+        for _, other_end, other_day, other_label in active:
+            minutes = min(end, other_end) - start
+            if minutes > 0:
+                overlaps.append((other_day, other_label, label, minutes))
+        active.append((start, end, day, label))
+
+    return {"ok": len(overlaps) == 0, "overlaps": overlaps}
+
+
+@register_metric("fragmentation", requires=("week_intervals",), default=False, expensive=True)
+def _metric_fragmentation(ctx):
+    """Free gaps between blocks too short to be useful: (day, start, end)."""
+    short_gaps = []
+    covered_until = None
+
+    for start, end, day, _ in ctx["week_intervals"]:
+        if covered_until is not None and 0 < start - covered_until < MIN_USEFUL_GAP:
+            gap_day = DAYS[min(covered_until // 1440, len(DAYS) - 1)]
+            short_gaps.append((
+                gap_day,
+                f"{covered_until % 1440 // 60:02d}:{covered_until % 60:02d}",
+                f"{start % 1440 // 60:02d}:{start % 60:02d}",
+            ))
+        covered_until = end if covered_until is None else max(covered_until, end)
+
+    return {"ok": len(short_gaps) == 0, "short_gaps": short_gaps}
+
+
+@register_metric("late_night_work", requires=("week_intervals",), default=False, expensive=True)
+def _metric_late_night_work(ctx):
+    """Non-sleep blocks inside the 23:00-05:00 window: (day, label, minutes)."""
+    violations = []
+
+    for start, end, day, label in ctx["week_intervals"]:
+        if "sleep" in label.lower():
+            continue
+
+        minutes = 0
+        first_day = start // 1440
+        for d in range(first_day - 1, end // 1440 + 1):
+            night_start = d * 1440 + LATE_NIGHT_START
+            night_end = night_start + (1440 - LATE_NIGHT_START) + LATE_NIGHT_END
+            minutes += max(0, min(end, night_end) - max(start, night_start))
 
-    for day, task_list in user_events.items():
-        for task, _ in task_list:
-            found = any(task in blk for blk in parsed.get(day, []))
-            if not found:
-                missing.append((day, task))
+        if minutes:
+            violations.append((day, label, minutes))
 
-    return len(missing) == 0, missing
+    return {"ok": len(violations) == 0, "violations": violations}
 
 
 # -----------------------------------------------------------
 #  MAIN EVALUATION FUNCTION
 # -----------------------------------------------------------
 
-def evaluate_schedule(schedule_text, user_events, min_sleep=8):
-    """Run all metrics and return a dictionary of results."""
+def evaluate_schedule(schedule_text, user_events, min_sleep=8,
+                      metrics=None, parallel=False):
+    """
+    Run the requested metrics (default: the four core metrics) and return
+    a dictionary of results keyed by metric name.
+
+    metrics:  iterable of names from METRICS, or None for DEFAULT_METRICS
+    parallel: run metrics registered as expensive on the shared pool.
+              Only worth it for metrics that release the GIL (I/O, numpy,
+              C extensions); the built-in metrics are pure Python, and for
+              them the hand-off makes evaluation slower, not faster.
+    """
+    names = list(DEFAULT_METRICS if metrics is None else metrics)
+    for name in names:
+        if name not in METRICS:
+            raise ValueError(f"Unknown metric: {name}")
+
+    ctx = {
+        "schedule_text": schedule_text,
+        "user_events": user_events,
+        "min_sleep": min_sleep,
+    }
+
+    # Build every needed input exactly once, before any metric runs.
+    for name in names:
+        for dep in METRICS[name]["requires"]:
+            _resolve_input(dep, ctx)
 
     results = {}
+    expensive = [n for n in names if METRICS[n]["expensive"]] if parallel else []
+
+    if len(expensive) > 1:
+        pool = _get_pool()
+        futures = {n: pool.submit(METRICS[n]["fn"], ctx) for n in expensive}
+        for name in names:
+            if name not in futures:
+                results[name] = METRICS[name]["fn"](ctx)
+        for name, future in futures.items():
+            results[name] = future.result()
+    else:
+        for name in names:
+            results[name] = METRICS[name]["fn"](ctx)
 
-    # Day completeness
-    ok, missing = metric_day_completeness(schedule_text)
-    results["day_completeness"] = {"ok": ok, "missing_days": missing}
+    return {name: results[name] for name in names}
 
-    # Sleep check
-    ok, violations = metric_sleep_hours(schedule_text, min_sleep)
-    results["sleep_requirement"] = {"ok": ok, "violations": violations}
 
-    # Total hours
-    ok, violations = metric_max_24_hours(schedule_text)
-    results["max_24_hours"] = {"ok": ok, "violations": violations}
+# -----------------------------------------------------------
+#  INCREMENTAL EVALUATION (interactive editing)
+# -----------------------------------------------------------
 
-    # Tasks preserved
-    ok, missing = metric_activity_preservation(schedule_text, user_events)
-    results["task_preservation"] = {"ok": ok, "missing_tasks": missing}
+class IncrementalEvaluator:
+    """
+    Keeps per-day metric contributions cached so that editing one day
+    only re-scores that day.
+
+        ev = IncrementalEvaluator(user_events, schedule_text=text)
+        ev.update_day("Tuesday", ["07:00-09:00-Gym", "21:00-05:00-Sleep"])
+        ev.results()   # same format as evaluate_schedule()
+    """
 
-    return results
+    def __init__(self, user_events, min_sleep=8, schedule_text=None):
+        self.user_events = user_events
+        self.min_sleep = min_sleep
+        self.day_blocks = {}
+
+        self._sleep = {}
+        self._totals = {}
+        self._missing = {}
+
+        self.load(schedule_text or "")
+
+    def load(self, schedule_text):
+        """Replace the whole week (full re-score)."""
+        self.day_blocks = {}
+        self._sleep = {}
+        self._totals = {}
+        self._missing = {
+            day: day_missing_tasks(day, [], tasks)
+            for day, tasks in self.user_events.items()
+        }
+
+        for day, blocks in extract_day_blocks(schedule_text).items():
+            self.update_day(day, blocks)
+
+    def update_day(self, day, blocks):
+        """
+        Replace one day's blocks and re-score only that day.
+        blocks: 'HH:MM-HH:MM-Activity' strings or (start, end, activity) tuples.
+        """
+        if day not in DAYS:
+            raise ValueError(f"Unknown day: {day}")
+
+        blocks = [b if isinstance(b, str) else "-".join(b) for b in blocks]
+        self.day_blocks[day] = blocks
+
+        self._sleep[day] = day_sleep_violations(day, blocks, self.min_sleep)
+        self._totals[day] = day_total_hours(blocks)
+        if day in self.user_events:
+            self._missing[day] = day_missing_tasks(day, blocks, self.user_events[day])
+
+    def remove_day(self, day):
+        """Drop a day from the schedule (as if its header were missing)."""
+        self.day_blocks.pop(day, None)
+        self._sleep.pop(day, None)
+        self._totals.pop(day, None)
+        if day in self.user_events:
+            self._missing[day] = day_missing_tasks(day, [], self.user_events[day])
+
+    def results(self):
+        """Assemble the cached per-day contributions into a results dict."""
+        missing_days = [d for d in DAYS if d not in self.day_blocks]
+
+        sleep = [v for day in self.day_blocks for v in self._sleep[day]]
+
+        over = [
+            (day, self._totals[day]) for day in self.day_blocks
+            if self._totals[day] > 24
+        ]
+
+        tasks = [m for day in self.user_events for m in self._missing[day]]
+
+        return {
+            "day_completeness": {"ok": not missing_days, "missing_days": missing_days},
+            "sleep_requirement": {"ok": not sleep, "violations": sleep},
+            "max_24_hours": {"ok": not over, "violations": over},
+            "task_preservation": {"ok": not tasks, "missing_tasks": tasks},
+        }
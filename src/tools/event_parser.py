@@ -1,7 +1,10 @@
 # src/tools/event_parser.py
 
 import re
-from datetime import datetime, timedelta
+import sys
+from datetime import date, datetime, timedelta
+
+from src.tools.ical import DEFAULT_TIMEZONE, current_week_start, iter_ics_events
 
 DAY_ALIASES = {
     "mon": "Monday",
@@ -29,71 +32,316 @@ ALL_DAYS = [
 ]
 
 
-def _normalize_time_str(t: str) -> str:
-    """Convert '8' or '8:30' into '08:00' or '08:30'."""
-    t = t.strip()
-    if ":" not in t:
-        t = f"{t}:00"
-    dt = datetime.strptime(t, "%H:%M")
-    return dt.strftime("%H:%M")
+# Time range like 08:00-10:00 or 8-10 or 8:30-10, split into hour/minute groups
+_TIME_RANGE_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?-(\d{1,2})(?::(\d{2}))?")
+
+
+def _to_minutes(hours: str, minutes) -> int:
+    """'8', None -> 480. Out-of-range values raise ValueError."""
+    h = int(hours)
+    m = int(minutes) if minutes else 0
+    if h > 23 or m > 59:
+        raise ValueError(f"time data '{hours}:{minutes or '00'}' is out of range")
+    return h * 60 + m
 
 
-def parse_user_events(text: str) -> dict:
+def parse_event_line(line: str):
     """
-    Parse user-input event lines like:
-        Monday 08:00-10:00 Gym
-        Tue 9-11 Work
-        Fri 21-5 Sleep
+    Tokenize one event line in a single pass (no strptime).
+    Returns (day, activity, duration_hours), or None if the line is not an
+    event. Raises ValueError for out-of-range times such as 25:00.
+    """
+    line = line.strip()
+    if not line:
+        return None
 
-    Return:
-        {
-          "Monday": [("Gym", 2.0), ("Work", 8.0), ...],
-          ...
-        }
-    where durations are in hours (float), for the LLM prompt.
+    parts = line.split(None, 2)
+    if len(parts) < 3:
+        # Need at least: Day, time-range, activity
+        return None
+
+    day = DAY_ALIASES.get(parts[0].lower())
+    if day is None:
+        return None
+
+    match = _TIME_RANGE_RE.search(line)
+    if not match:
+        return None
+
+    sh, sm, eh, em = match.groups()
+    start = _to_minutes(sh, sm)
+    end = _to_minutes(eh, em)
+
+    # Allow crossing midnight
+    if end <= start:
+        end += 1440
+
+    # Activity label is everything after the time range
+    activity = line[match.end():].strip() or "Task"
+
+    return day, activity, (end - start) / 60.0
+
+
+# ----------------------------------------------------------
+# Recurring events ("every weekday 8-10 Gym", RRULE strings)
+# ----------------------------------------------------------
+
+RRULE_DAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+
+_EVERY_GROUPS = {
+    "day": range(7),
+    "daily": range(7),
+    "weekday": range(5),
+    "weekdays": range(5),
+    "weekend": (5, 6),
+    "weekends": (5, 6),
+}
+
+# Anchor for INTERVAL > 1 rules without DTSTART (a Monday); COUNT needs a real DTSTART
+_DEFAULT_ANCHOR = date(1970, 1, 5)
+
+
+def _parse_rrule_date(value: str) -> date:
+    return date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+
+
+def parse_rrule(spec: str, dtstart=None) -> dict:
     """
-    events = {day: [] for day in ALL_DAYS}
+    'FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20261215' -> rule dict for iter_occurrences().
+    dtstart (a date) is used when the spec has no DTSTART part, as for a
+    VEVENT RRULE whose start is a separate property. Raises ValueError.
+    """
+    parts = dict(p.split("=", 1) for p in spec.split(";") if "=" in p)
+    freq = parts.get("FREQ", "WEEKLY").upper()
+    if freq not in ("DAILY", "WEEKLY"):
+        raise ValueError(f"Unsupported RRULE FREQ: {freq}")
 
-    for raw_line in text.strip().splitlines():
-        line = raw_line.strip()
-        if not line:
-            continue
+    interval = int(parts.get("INTERVAL", 1))
+    if interval < 1:
+        raise ValueError(f"RRULE INTERVAL must be at least 1: {interval}")
 
-        parts = line.split()
-        if len(parts) < 3:
-            # Need at least: Day, time-range, activity
-            continue
+    rule = {
+        "freq": freq,
+        "interval": interval,
+        "byday": None,
+        "until": _parse_rrule_date(parts["UNTIL"]) if "UNTIL" in parts else None,
+        "count": int(parts["COUNT"]) if "COUNT" in parts else None,
+        "dtstart": _parse_rrule_date(parts["DTSTART"]) if "DTSTART" in parts else dtstart,
+    }
+    if rule["count"] is not None and rule["dtstart"] is None:
+        raise ValueError("RRULE with COUNT needs a DTSTART to count from")
+    if "BYDAY" in parts:
+        # ignore ordinal prefixes like 1MO; weekly/daily rules only need the day
+        codes = [d.strip()[-2:].upper() for d in parts["BYDAY"].split(",")]
+        unknown = [c for c in codes if c not in RRULE_DAYS]
+        if unknown:
+            raise ValueError(f"Unknown RRULE BYDAY day: {', '.join(unknown)}")
+        rule["byday"] = {RRULE_DAYS[c] for c in codes}
+    return rule
 
-        day_token = parts[0].lower()
-        day = DAY_ALIASES.get(day_token)
-        if day is None:
+
+def _parse_every(spec: str):
+    """Day set for 'every ...' text, or None if it isn't a plain list of days."""
+    days = set()
+    for token in re.split(r"[,/\s]+|\band\b", spec.lower()):
+        if not token:
             continue
+        if token in _EVERY_GROUPS:
+            days.update(_EVERY_GROUPS[token])
+        elif token in DAY_ALIASES:
+            days.add(ALL_DAYS.index(DAY_ALIASES[token]))
+        elif token.rstrip("s") in DAY_ALIASES:   # "mondays"
+            days.add(ALL_DAYS.index(DAY_ALIASES[token.rstrip("s")]))
+        else:
+            return None     # e.g. "every other day": free text, not a rule
+
+    if not days:
+        return None
+    return {
+        "freq": "WEEKLY", "interval": 1, "byday": days,
+        "until": None, "count": None, "dtstart": None,
+    }
+
+
+def parse_recurring_line(line: str):
+    """
+    Parse a recurring event line into a rule dict, or None if the line is
+    not recurring. Accepted forms:
+        every weekday 08:00-10:00 Gym
+        every Mon, Wed and Fri 9-11 Study
+        every weekend 10-12 Hike
+        RRULE:FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20261215 13-15 Lab
+    """
+    line = line.strip()
+    lowered = line.lower()
+    if not (lowered.startswith("every ") or lowered.startswith("rrule:")):
+        return None
+
+    match = _TIME_RANGE_RE.search(line)
+    if not match:
+        return None
+
+    spec = line[:match.start()].strip()
+    if lowered.startswith("every "):
+        rule = _parse_every(spec[len("every "):])
+        if rule is None:
+            return None
+    else:
+        rule = parse_rrule(spec[len("rrule:"):])
+
+    sh, sm, eh, em = match.groups()
+    rule["start_min"] = _to_minutes(sh, sm)
+    rule["end_min"] = _to_minutes(eh, em)
+    rule["activity"] = line[match.end():].strip() or "Task"
+    return rule
+
+
+def _rule_matches(rule: dict, day: date, anchor: date) -> bool:
+    byday = rule["byday"]
+    if rule["freq"] == "DAILY":
+        if (day - anchor).days % rule["interval"]:
+            return False
+        return byday is None or day.weekday() in byday
 
-        # Find time range like 08:00-10:00 or 8-10 or 8:30-10
-        match = re.search(r"(\d{1,2}(:\d{2})?)-(\d{1,2}(:\d{2})?)", line)
-        if not match:
+    if byday is None:
+        byday = {anchor.weekday()}
+    if day.weekday() not in byday:
+        return False
+    anchor_monday = anchor - timedelta(days=anchor.weekday())
+    weeks = (day - anchor_monday).days // 7
+    return weeks % rule["interval"] == 0
+
+
+def _count_before(rule: dict, anchor: date, day: date) -> int:
+    """
+    Occurrences in [anchor, day), by arithmetic: the match pattern repeats
+    every 7 * interval days from the anchor, so count whole periods and
+    look up only the remainder.
+    """
+    period = 7 * rule["interval"]
+    pattern = [_rule_matches(rule, anchor + timedelta(days=k), anchor) for k in range(period)]
+    full, rest = divmod(max((day - anchor).days, 0), period)
+    return full * sum(pattern) + sum(pattern[:rest])
+
+
+def iter_occurrences(rule: dict, window_start: date, window_end: date):
+    """
+    Lazily yield (date, start_min, end_min, activity) for occurrences in
+    [window_start, window_end). Only dates inside the window are visited;
+    for COUNT rules the occurrences before the window are counted, not walked.
+    """
+    anchor = rule["dtstart"] or _DEFAULT_ANCHOR
+    first = max(window_start, rule["dtstart"] or window_start)
+    last = window_end
+    if rule["until"] is not None:
+        last = min(last, rule["until"] + timedelta(days=1))
+
+    seen = 0
+    if rule["count"] is not None:
+        seen = _count_before(rule, anchor, first)
+
+    day = first
+    while day < last:
+        if rule["count"] is not None and seen >= rule["count"]:
+            return
+        if _rule_matches(rule, day, anchor):
+            seen += 1
+            yield day, rule["start_min"], rule["end_min"], rule["activity"]
+        day += timedelta(days=1)
+
+
+def _rule_week_events(rule: dict, week_start: date):
+    for day, start, end, activity in iter_occurrences(
+        rule, week_start, week_start + timedelta(days=7)
+    ):
+        if end <= start:
+            end += 1440
+        yield ALL_DAYS[day.weekday()], activity, (end - start) / 60.0
+
+
+def iter_user_events(lines, strict: bool = False, week_start=None):
+    """
+    Lazily yield (day, activity, duration_hours) from any iterable of lines
+    (an open file, sys.stdin, a generator). Nothing is buffered beyond the
+    current line. Lines with out-of-range times are skipped unless strict.
+
+    Recurring lines are expanded only for the week starting at week_start
+    (default: the current week).
+    """
+    for raw_line in lines:
+        try:
+            rule = parse_recurring_line(raw_line)
+            if rule is not None:
+                yield from _rule_week_events(rule, week_start or current_week_start())
+                continue
+
+            event = parse_event_line(raw_line)
+        except ValueError:
+            if strict:
+                raise
             continue
 
-        start_raw = match.group(1)
-        end_raw = match.group(3)
+        if event is not None:
+            yield event
+
+
+def iter_event_file(path: str, strict: bool = False, week_start=None):
+    """Stream events from a file path, or from stdin when path is '-'."""
+    if path == "-":
+        yield from iter_user_events(sys.stdin, strict, week_start)
+        return
+
+    with open(path, encoding="utf-8") as fh:
+        yield from iter_user_events(fh, strict, week_start)
+
+
+def load_event_file(path: str, strict: bool = False, week_start=None) -> dict:
+    """Stream a file into the parse_user_events() dict without reading it whole."""
+    events = {day: [] for day in ALL_DAYS}
+    for day, activity, hours in iter_event_file(path, strict, week_start):
+        events[day].append((activity, hours))
+    return events
 
-        start_str = _normalize_time_str(start_raw)
-        end_str = _normalize_time_str(end_raw)
 
-        start_dt = datetime.strptime(start_str, "%H:%M")
-        end_dt = datetime.strptime(end_str, "%H:%M")
+def load_ics_file(path: str, week_start=None, timezone=DEFAULT_TIMEZONE) -> dict:
+    """
+    Stream an .ics file into the parse_user_events() dict for one week
+    (default: the current week) in the planner's timezone. VEVENTs are read
+    one at a time, recurring ones are expanded for the week, and events
+    outside the week are dropped as they are read.
+    """
+    week_start = week_start or current_week_start()
+    window_start = datetime(week_start.year, week_start.month, week_start.day)
+    window_end = window_start + timedelta(days=7)
 
-        # Allow crossing midnight
-        if end_dt <= start_dt:
-            end_dt += timedelta(days=1)
+    events = {day: [] for day in ALL_DAYS}
+    with open(path, encoding="utf-8", newline="") as fh:
+        for start, end, summary in iter_ics_events(fh, window_start, window_end, timezone=timezone):
+            hours = (end - start).total_seconds() / 3600.0
+            events[ALL_DAYS[start.weekday()]].append((summary, hours))
 
-        duration_hours = (end_dt - start_dt).total_seconds() / 3600.0
+    return events
+
+
+def parse_user_events(text: str, week_start=None) -> dict:
+    """
+    Parse user-input event lines like:
+        Monday 08:00-10:00 Gym
+        Tue 9-11 Work
+        Fri 21-5 Sleep
+        every weekday 7-8 Run        (expanded for week_start's week)
 
-        # Activity label is everything after the time range
-        activity = line.split(match.group(0), 1)[-1].strip()
-        if not activity:
-            activity = "Task"
+    Return:
+        {
+          "Monday": [("Gym", 2.0), ("Work", 8.0), ...],
+          ...
+        }
+    where durations are in hours (float), for the LLM prompt.
+    """
+    events = {day: [] for day in ALL_DAYS}
 
-        events[day].append((activity, duration_hours))
+    lines = text.strip().splitlines()
+    for day, activity, hours in iter_user_events(lines, strict=True, week_start=week_start):
+        events[day].append((activity, hours))
 
     return events
@@ -0,0 +1,418 @@
+# src/tools/fake_calendar_server.py
+
+"""
+In-process stand-in for the Google Calendar v3 REST API.
+
+Implements the subset used by google_calendar_api.py and async_calendar.py
+so bulk sync, diff sync and concurrency can be benchmarked and regression
+tested offline (no OAuth, no network):
+
+    POST   /calendar/v3/calendars/{cal}/events            insert
+    GET    /calendar/v3/calendars/{cal}/events            list (timeMin/timeMax,
+                                                          privateExtendedProperty,
+                                                          pageToken, syncToken)
+    GET    /calendar/v3/calendars/{cal}/events/{id}       get
+    PATCH  /calendar/v3/calendars/{cal}/events/{id}       patch
+    DELETE /calendar/v3/calendars/{cal}/events/{id}       delete
+    POST   /calendar/v3/freeBusy                          freeBusy query
+    POST   /batch/calendar/v3                             multipart/mixed batch
+
+Usage:
+    with FakeCalendarServer(latency=0.02, error_rate=0.1) as server:
+        cal = GoogleCalendarService(root_url=server.root_url,
+                                    credentials=AnonymousCredentials())
+        cal.authenticate()
+
+latency is added once per HTTP request (a batch pays it once); injected
+errors are decided per logical request, so batch items fail individually.
+"""
+
+import datetime
+import email.parser
+import email.policy
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from zoneinfo import ZoneInfo
+
+API_PREFIX = "/calendar/v3/"
+BATCH_PATH = "/batch/calendar/v3"
+DEFAULT_PAGE_SIZE = 250
+
+ERROR_REASONS = {
+    403: ("rateLimitExceeded", "Rate Limit Exceeded"),
+    404: ("notFound", "Not Found"),
+    410: ("fullSyncRequired", "Sync token is no longer valid, a full sync is required."),
+    429: ("rateLimitExceeded", "Rate Limit Exceeded"),
+    500: ("backendError", "Backend Error"),
+    503: ("backendError", "Service Unavailable"),
+}
+
+
+def _error(status, reason=None, message=None):
+    default_reason, default_message = ERROR_REASONS.get(status, ("error", "Error"))
+    return status, {"error": {
+        "code": status,
+        "message": message or default_message,
+        "errors": [{"reason": reason or default_reason, "message": message or default_message}],
+    }}
+
+
+def _parse_time(value):
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _event_span(event):
+    """(start, end) as aware datetimes; all-day events are treated as UTC days."""
+    def point(p):
+        if "dateTime" in p:
+            dt = _parse_time(p["dateTime"])
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=ZoneInfo(p.get("timeZone", "UTC")))
+            return dt
+        return datetime.datetime.combine(
+            datetime.date.fromisoformat(p["date"]), datetime.time(), datetime.timezone.utc
+        )
+    return point(event["start"]), point(event["end"])
+
+
+def _with_offsets(event):
+    """
+    Like the real API, return every dateTime with a UTC offset: naive
+    request values are read in their timeZone (UTC if none is given).
+    """
+    for key in ("start", "end"):
+        point = event.get(key)
+        if isinstance(point, dict) and "dateTime" in point:
+            dt = _parse_time(point["dateTime"])
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=ZoneInfo(point.get("timeZone", "UTC")))
+            event[key] = dict(point, dateTime=dt.isoformat())
+    return event
+
+
+class CalendarStore:
+    """
+    Thread-safe event storage with a change sequence for sync tokens.
+    Deleted events are kept as status "cancelled" so incremental syncs see them.
+    """
+
+    def __init__(self):
+        self.calendars = {}        # calendar id -> {event id: event}
+        self.seq = 0
+        self.min_sync_seq = 0      # tokens older than this get 410
+        self._lock = threading.Lock()
+
+    def _touch(self, event):
+        self.seq += 1
+        event["_seq"] = self.seq
+        event["etag"] = f'"{self.seq}"'
+        event["updated"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    @staticmethod
+    def _public(event):
+        return {k: v for k, v in event.items() if not k.startswith("_")}
+
+    def insert(self, cal_id, body):
+        with self._lock:
+            event = _with_offsets(dict(body, id=uuid.uuid4().hex, status="confirmed"))
+            self._touch(event)
+            self.calendars.setdefault(cal_id, {})[event["id"]] = event
+            return 200, self._public(event)
+
+    def get(self, cal_id, event_id):
+        with self._lock:
+            event = self.calendars.get(cal_id, {}).get(event_id)
+            if event is None:
+                return _error(404)
+            return 200, self._public(event)
+
+    def patch(self, cal_id, event_id, body):
+        with self._lock:
+            event = self.calendars.get(cal_id, {}).get(event_id)
+            if event is None or event["status"] == "cancelled":
+                return _error(404)
+            for key, value in body.items():
+                if isinstance(value, dict) and isinstance(event.get(key), dict):
+                    event[key] = dict(event[key], **value)
+                else:
+                    event[key] = value
+            _with_offsets(event)
+            self._touch(event)
+            return 200, self._public(event)
+
+    def delete(self, cal_id, event_id):
+        with self._lock:
+            event = self.calendars.get(cal_id, {}).get(event_id)
+            if event is None or event["status"] == "cancelled":
+                return _error(410 if event else 404, "deleted" if event else None)
+            event["status"] = "cancelled"
+            self._touch(event)
+            return 204, None
+
+    def expire_sync_tokens(self):
+        """Invalidate all outstanding sync tokens (clients must resync)."""
+        with self._lock:
+            self.min_sync_seq = self.seq + 1
+
+    def list(self, cal_id, params):
+        with self._lock:
+            events = sorted(self.calendars.get(cal_id, {}).values(), key=lambda e: e["_seq"])
+            seq = self.seq
+
+            sync_token = params.get("syncToken")
+            if sync_token:
+                since = int(sync_token)
+                if since < self.min_sync_seq:
+                    return _error(410)
+                events = [e for e in events if e["_seq"] > since]
+            else:
+                events = [e for e in events if e["status"] != "cancelled"]
+                if "timeMin" in params:
+                    t_min = _parse_time(params["timeMin"])
+                    events = [e for e in events if _event_span(e)[1] > t_min]
+                if "timeMax" in params:
+                    t_max = _parse_time(params["timeMax"])
+                    events = [e for e in events if _event_span(e)[0] < t_max]
+                for prop in params.get("privateExtendedProperty", []):
+                    name, _, value = prop.partition("=")
+                    events = [
+                        e for e in events
+                        if e.get("extendedProperties", {}).get("private", {}).get(name) == value
+                    ]
+
+            if params.get("orderBy") == "startTime":
+                events.sort(key=lambda e: _event_span(e)[0])
+
+            offset = int(params.get("pageToken") or 0)
+            size = int(params.get("maxResults") or DEFAULT_PAGE_SIZE)
+            page = {"kind": "calendar#events", "items": [self._public(e) for e in events[offset:offset + size]]}
+            if offset + size < len(events):
+                page["nextPageToken"] = str(offset + size)
+            else:
+                page["nextSyncToken"] = str(seq)
+            return 200, page
+
+    def free_busy(self, body):
+        t_min, t_max = _parse_time(body["timeMin"]), _parse_time(body["timeMax"])
+        calendars = {}
+        with self._lock:
+            for item in body.get("items", []):
+                cal_id = item["id"]
+                if cal_id not in self.calendars:
+                    calendars[cal_id] = {"busy": [], "errors": [{"domain": "global", "reason": "notFound"}]}
+                    continue
+                busy = []
+                for event in self.calendars[cal_id].values():
+                    if event["status"] == "cancelled" or event.get("transparency") == "transparent":
+                        continue
+                    start, end = _event_span(event)
+                    if end > t_min and start < t_max:
+                        busy.append((max(start, t_min), min(end, t_max)))
+                merged = []
+                for start, end in sorted(busy):
+                    if merged and start <= merged[-1][1]:
+                        merged[-1][1] = max(merged[-1][1], end)
+                    else:
+                        merged.append([start, end])
+                calendars[cal_id] = {"busy": [
+                    {"start": s.isoformat(), "end": e.isoformat()} for s, e in merged
+                ]}
+        return 200, {"kind": "calendar#freeBusy", "timeMin": body["timeMin"],
+                     "timeMax": body["timeMax"], "calendars": calendars}
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    # the stdlib listen backlog of 5 drops connections under concurrent load
+    request_queue_size = 256
+    daemon_threads = True
+
+
+class FakeCalendarServer:
+    """
+    latency:      seconds added to every HTTP request
+    error_rate:   probability that a logical request fails with error_status
+    error_status: injected status (429, 403 rateLimitExceeded, 500, 503)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0,
+                 error_status=429, seed=0):
+        self.store = CalendarStore()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.request_count = 0          # HTTP requests (a batch counts once)
+        self.call_count = 0             # logical API calls (batch items count each)
+        self._rng = random.Random(seed)
+        self._fail_next = []
+        self._lock = threading.Lock()
+
+        self.httpd = _HTTPServer((host, port), _make_handler(self))
+        self._thread = None
+
+    @property
+    def root_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def base_url(self):
+        """Calendar v3 base URL, for AsyncCalendarClient(base_url=...)."""
+        return self.root_url + API_PREFIX.lstrip("/")
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def fail_next(self, count=1, status=429):
+        """Deterministically fail the next `count` logical requests."""
+        with self._lock:
+            self._fail_next.extend([status] * count)
+
+    # --------------------------------------------------------
+    # Dispatch
+    # --------------------------------------------------------
+    def _injected_error(self):
+        with self._lock:
+            self.call_count += 1
+            if self._fail_next:
+                return _error(self._fail_next.pop(0))
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return _error(self.error_status)
+        return None
+
+    def dispatch(self, method, path, query, body):
+        """Handle one logical API request. Returns (status, json-able or None)."""
+        injected = self._injected_error()
+        if injected:
+            return injected
+
+        if not path.startswith(API_PREFIX):
+            return _error(404)
+        parts = [unquote(p) for p in path[len(API_PREFIX):].strip("/").split("/")]
+        params = {k: v if k == "privateExtendedProperty" else v[-1] for k, v in query.items()}
+
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return _error(400, "parseError", "Parse Error")
+
+        if parts == ["freeBusy"] and method == "POST":
+            return self.store.free_busy(payload)
+
+        if len(parts) >= 3 and parts[0] == "calendars" and parts[2] == "events":
+            cal_id = parts[1]
+            if len(parts) == 3:
+                if method == "POST":
+                    return self.store.insert(cal_id, payload)
+                if method == "GET":
+                    return self.store.list(cal_id, params)
+            elif len(parts) == 4:
+                event_id = parts[3]
+                if method == "GET":
+                    return self.store.get(cal_id, event_id)
+                if method in ("PATCH", "PUT"):
+                    return self.store.patch(cal_id, event_id, payload)
+                if method == "DELETE":
+                    return self.store.delete(cal_id, event_id)
+
+        return _error(404)
+
+    def dispatch_batch(self, content_type, body):
+        """Run each part of a multipart/mixed batch; returns (content_type, bytes)."""
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+        )
+        boundary = "batch_" + uuid.uuid4().hex
+        out = []
+
+        for part in message.iter_parts():
+            content_id = part.get("Content-ID", "")
+            raw = part.get_payload(decode=True) or b""
+            head, _, inner_body = raw.replace(b"\r\n", b"\n").partition(b"\n\n")
+            request_line = head.split(b"\n", 1)[0].decode("latin-1")
+            method, target = request_line.split(" ")[:2]
+            url = urlsplit(target)
+
+            status, payload = self.dispatch(method, url.path, parse_qs(url.query), inner_body)
+            data = json.dumps(payload) if payload is not None else ""
+
+            response_id = content_id.strip("<>")
+            out.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{response_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {_reason(status)}\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n"
+                f"Content-Length: {len(data.encode('utf-8'))}\r\n\r\n"
+                f"{data}\r\n"
+            )
+
+        out.append(f"--{boundary}--\r\n")
+        return f"multipart/mixed; boundary={boundary}", "".join(out).encode("utf-8")
+
+
+def _reason(status):
+    return {200: "OK", 204: "No Content"}.get(status, ERROR_REASONS.get(status, ("", "Error"))[1])
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # headers and body go out as separate writes; with Nagle on, each
+        # keep-alive response stalls on the client's delayed ACK (~40 ms)
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _respond(self, status, content_type=None, data=b""):
+            self.send_response(status)
+            if content_type:
+                self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            if data:
+                self.wfile.write(data)
+
+        def _handle(self):
+            with server._lock:
+                server.request_count += 1
+            if server.latency:
+                time.sleep(server.latency)
+
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            url = urlsplit(self.path)
+
+            if url.path == BATCH_PATH and self.command == "POST":
+                content_type, data = server.dispatch_batch(self.headers.get("Content-Type", ""), body)
+                self._respond(200, content_type, data)
+                return
+
+            status, payload = server.dispatch(self.command, url.path, parse_qs(url.query), body)
+            if payload is None:
+                self._respond(status)
+            else:
+                self._respond(status, "application/json; charset=UTF-8", json.dumps(payload).encode("utf-8"))
+
+        do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _handle
+
+    return Handler
@@ -2,57 +2,515 @@
 
 from __future__ import print_function
 import datetime
+import hashlib
+import json
 import os.path
+import threading
+import time
+from zoneinfo import ZoneInfo
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
 
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
+TOKEN_PATH = "token.json"
+
+DEFAULT_ROOT_URL = "https://www.googleapis.com/"
+SERVICE_PATH = "calendar/v3/"
+BATCH_PATH = "batch/calendar/v3"
+TIMEZONE = "America/Denver"
+
+# Calendar API rejects batches larger than 50 requests
+BATCH_SIZE = 50
+# ... and freeBusy queries over more than 50 calendars
+FREEBUSY_MAX_CALENDARS = 50
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Process-wide caches: the parsed discovery document and credentials per
+# token file, so constructing services does no file or network I/O.
+_DISCOVERY_DOC = None
+_CREDENTIALS = {}
+_AUTH_LOCK = threading.RLock()
+
+# Private extended properties marking events this app created
+MANAGED_PROP = "plannerManaged"
+KEY_PROP = "plannerKey"
+HASH_PROP = "plannerHash"
+
+
+def event_body(summary, start_time, end_time, timezone=TIMEZONE):
+    return {
+        "summary": summary,
+        "start": {"dateTime": start_time.isoformat(), "timeZone": timezone},
+        "end":   {"dateTime": end_time.isoformat(), "timeZone": timezone},
+    }
+
+
+# -----------------------------------------------------------
+# Shared discovery document and credentials
+# -----------------------------------------------------------
+
+def discovery_document():
+    """Calendar v3 discovery document, read from the bundled static copy once."""
+    global _DISCOVERY_DOC
+    if _DISCOVERY_DOC is None:
+        with _AUTH_LOCK:
+            if _DISCOVERY_DOC is None:
+                _DISCOVERY_DOC = json.loads(get_static_doc("calendar", "v3"))
+    return _DISCOVERY_DOC
 
-class GoogleCalendarService:
 
-    def __init__(self):
-        self.creds = None
-        self.service = None
+def ensure_fresh(creds):
+    """Refresh expired credentials; serialized so threads don't refresh twice."""
+    if creds.expired and creds.refresh_token:
+        with _AUTH_LOCK:
+            if creds.expired:
+                creds.refresh(Request())
+    return creds
 
-    def authenticate(self):
-        token_path = "token.json"
 
-        if os.path.exists(token_path):
-            self.creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+def load_credentials(token_path=TOKEN_PATH):
+    """
+    Credentials for token_path, shared by every service in the process.
+    Runs the browser OAuth flow only when there is no usable token.
+    """
+    with _AUTH_LOCK:
+        creds = _CREDENTIALS.get(token_path)
 
-        if self.creds and self.creds.expired and self.creds.refresh_token:
-            self.creds.refresh(Request())
+        if creds is None and os.path.exists(token_path):
+            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
 
-        if not self.creds or not self.creds.valid:
+        if creds is not None:
+            ensure_fresh(creds)
+
+        if not creds or not creds.valid:
             flow = InstalledAppFlow.from_client_secrets_file("credentials.json", SCOPES)
-            self.creds = flow.run_local_server(port=0)
+            creds = flow.run_local_server(port=0)
             with open(token_path, "w") as token:
-                token.write(self.creds.to_json())
+                token.write(creds.to_json())
+
+        _CREDENTIALS[token_path] = creds
+        return creds
+
+
+def _rfc3339(dt, timezone=TIMEZONE):
+    """Naive datetimes are taken to be in the planner's timezone."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=ZoneInfo(timezone))
+    return dt.isoformat()
+
+
+def _content_hash(body):
+    fields = {k: body.get(k) for k in ("summary", "start", "end")}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def tag_events(events, timezone=TIMEZONE):
+    """
+    [(summary, start_time, end_time), ...] -> {key: event body}.
+
+    The key is "<date>|<summary>|<n>" (n-th block with that summary on that
+    date), so moving or resizing a block keeps its key and becomes a patch.
+    """
+    tagged, seen = {}, {}
+    for summary, start_time, end_time in events:
+        base = f"{start_time.date().isoformat()}|{summary}"
+        n = seen[base] = seen.get(base, -1) + 1
+        key = f"{base}|{n}"
+
+        body = event_body(summary, start_time, end_time, timezone)
+        body["extendedProperties"] = {"private": {
+            MANAGED_PROP: "1",
+            KEY_PROP: key,
+            HASH_PROP: _content_hash(body),
+        }}
+        tagged[key] = body
+    return tagged
+
+
+def plan_sync(desired, existing):
+    """
+    desired:  {key: body} from tag_events().
+    existing: managed events already in the calendar.
+    Returns (inserts, patches, deletes):
+        inserts  [key, ...]
+        patches  [(event_id, key), ...]
+        deletes  [event_id, ...]
+    """
+    current = {}
+    deletes = []
+    for event in existing:
+        props = event.get("extendedProperties", {}).get("private", {})
+        key = props.get(KEY_PROP)
+        if key in desired and key not in current:
+            current[key] = (event["id"], props.get(HASH_PROP))
+        else:
+            deletes.append(event["id"])     # stale or duplicate
+
+    inserts, patches = [], []
+    for key, body in desired.items():
+        if key not in current:
+            inserts.append(key)
+        else:
+            event_id, old_hash = current[key]
+            if old_hash != body["extendedProperties"]["private"][HASH_PROP]:
+                patches.append((event_id, key))
+
+    return inserts, patches, deletes
+
+
+def _parse_rfc3339(value):
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _event_start(event, timezone=TIMEZONE):
+    """
+    Aware start datetime of an event (all-day events start at local midnight).
+    Naive dateTimes, as event_body writes them, are read in the event's own
+    timeZone so they compare with the cache's aware window bounds.
+    """
+    start = event.get("start", {})
+    if "dateTime" in start:
+        dt = _parse_rfc3339(start["dateTime"])
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=ZoneInfo(start.get("timeZone", timezone)))
+        return dt
+    day = datetime.date.fromisoformat(start["date"])
+    return datetime.datetime.combine(day, datetime.time(), ZoneInfo(timezone))
+
+
+def _is_retryable(error):
+    """Rate limits and server errors are retried; everything else is final."""
+    if not isinstance(error, HttpError):
+        return False
+    status = error.resp.status
+    if status == 403:
+        # 403 is only transient for (user)RateLimitExceeded, not for permissions
+        return b"ratelimitexceeded" in (error.content or b"").lower()
+    return status in RETRY_STATUSES
+
+
+class GoogleCalendarService:
+    """
+    root_url:    API root, e.g. "http://127.0.0.1:8080/" for a local fake server.
+    credentials: pre-built credentials (skips token.json / the OAuth flow).
+
+    The underlying API client is built per thread (httplib2 connections are
+    not thread-safe) from the cached discovery document, so one instance can
+    be shared by worker threads.
+    """
+
+    def __init__(self, root_url=None, credentials=None, calendar_id="primary"):
+        self.creds = credentials
+        self.root_url = root_url or DEFAULT_ROOT_URL
+        self.batch_uri = self.root_url + BATCH_PATH
+        self.calendar_id = calendar_id
+        self.event_cache = None
+        self._local = threading.local()
+
+    def authenticate(self, token_path=TOKEN_PATH):
+        if self.creds is None:
+            self.creds = load_credentials(token_path)
+        else:
+            ensure_fresh(self.creds)
+        self._local.service = self._build()
+
+    def _build(self):
+        client_options = None
+        if self.root_url != DEFAULT_ROOT_URL:
+            client_options = {"api_endpoint": self.root_url + SERVICE_PATH}
+
+        return build_from_document(
+            discovery_document(), credentials=self.creds, client_options=client_options
+        )
 
-        self.service = build("calendar", "v3", credentials=self.creds)
+    @property
+    def service(self):
+        service = getattr(self._local, "service", None)
+        if service is None and self.creds is not None:
+            ensure_fresh(self.creds)
+            service = self._local.service = self._build()
+        return service
 
     def create_event(self, summary, start_time, end_time):
-        event_body = {
-            "summary": summary,
-            "start": {"dateTime": start_time.isoformat(), "timeZone": "America/Denver"},
-            "end":   {"dateTime": end_time.isoformat(), "timeZone": "America/Denver"},
+        body = event_body(summary, start_time, end_time)
+        return self.service.events().insert(calendarId=self.calendar_id, body=body).execute()
+
+    # --------------------------------------------------------
+    # Batched writes
+    # --------------------------------------------------------
+    def _execute_batched(self, make_request, keys, batch_size=BATCH_SIZE,
+                         max_retries=3, backoff=1.0):
+        """
+        Run one API request per key through HTTP batch requests of
+        `batch_size`. Items that fail with a rate-limit or server error are
+        retried in a new batch after an exponential backoff; items that
+        succeeded are never resent. Returns (results, errors), both keyed by key.
+        """
+        results, errors = {}, {}
+        pending = list(keys)
+
+        for attempt in range(max_retries + 1):
+            if attempt:
+                time.sleep(backoff * 2 ** (attempt - 1))
+            retry = []
+
+            for i in range(0, len(pending), batch_size):
+                chunk = pending[i:i + batch_size]
+
+                def callback(request_id, response, exception, chunk=chunk):
+                    key = chunk[int(request_id)]
+                    if exception is None:
+                        results[key] = response
+                        errors.pop(key, None)
+                    else:
+                        errors[key] = exception
+                        if _is_retryable(exception):
+                            retry.append(key)
+
+                batch = BatchHttpRequest(callback=callback, batch_uri=self.batch_uri)
+                for n, key in enumerate(chunk):
+                    batch.add(make_request(key), request_id=str(n))
+
+                try:
+                    batch.execute()
+                except HttpError as exc:
+                    # the whole batch request failed (e.g. 429 on the envelope)
+                    for key in chunk:
+                        if key not in results:
+                            errors[key] = exc
+                            if _is_retryable(exc):
+                                retry.append(key)
+
+            if not retry:
+                break
+            pending = retry
+
+        return results, errors
+
+    def create_events_batch(self, events, batch_size=BATCH_SIZE, max_retries=3, backoff=1.0):
+        """
+        Insert many events in as few round-trips as possible.
+
+        events: iterable of (summary, start_time, end_time) or event bodies.
+        Returns (created, errors): created[i] is the inserted event for
+        events[i] (None if it failed), errors maps index -> final HttpError.
+        """
+        bodies = [e if isinstance(e, dict) else event_body(*e) for e in events]
+        insert = self.service.events().insert
+
+        results, errors = self._execute_batched(
+            lambda i: insert(calendarId=self.calendar_id, body=bodies[i]),
+            range(len(bodies)),
+            batch_size=batch_size,
+            max_retries=max_retries,
+            backoff=backoff,
+        )
+        return [results.get(i) for i in range(len(bodies))], errors
+
+    # --------------------------------------------------------
+    # Diff-based sync
+    # --------------------------------------------------------
+    def list_managed_events(self, time_min, time_max):
+        """Events in [time_min, time_max) that were created by sync_events()."""
+        return list(self.iter_events(
+            timeMin=_rfc3339(time_min),
+            timeMax=_rfc3339(time_max),
+            privateExtendedProperty=f"{MANAGED_PROP}=1",
+            singleEvents=True,
+        ))
+
+    def sync_events(self, events, time_min, time_max, batch_size=BATCH_SIZE,
+                    max_retries=3, backoff=1.0):
+        """
+        Make the managed events in [time_min, time_max) match `events`
+        ([(summary, start_time, end_time), ...]) with the fewest writes:
+        unchanged blocks are left alone, edited blocks are patched, new
+        blocks inserted and removed blocks deleted. Events not created by
+        this app are never touched.
+
+        Returns {"inserted", "patched", "deleted", "unchanged", "errors"}.
+        """
+        desired = tag_events(events)
+        existing = self.list_managed_events(time_min, time_max)
+        inserts, patches, deletes = plan_sync(desired, existing)
+
+        ops = [("insert", key) for key in inserts]
+        ops += [("patch", item) for item in patches]
+        ops += [("delete", event_id) for event_id in deletes]
+
+        api = self.service.events()
+
+        def make_request(i):
+            kind, arg = ops[i]
+            if kind == "insert":
+                return api.insert(calendarId=self.calendar_id, body=desired[arg])
+            if kind == "patch":
+                event_id, key = arg
+                return api.patch(calendarId=self.calendar_id, eventId=event_id, body=desired[key])
+            return api.delete(calendarId=self.calendar_id, eventId=arg)
+
+        _, errors = self._execute_batched(
+            make_request, range(len(ops)),
+            batch_size=batch_size, max_retries=max_retries, backoff=backoff,
+        )
+
+        return {
+            "inserted": len(inserts) - sum(ops[i][0] == "insert" for i in errors),
+            "patched": len(patches) - sum(ops[i][0] == "patch" for i in errors),
+            "deleted": len(deletes) - sum(ops[i][0] == "delete" for i in errors),
+            "unchanged": len(desired) - len(inserts) - len(patches),
+            "errors": {ops[i]: err for i, err in errors.items()},
         }
-        return self.service.events().insert(calendarId="primary", body=event_body).execute()
+
+    # --------------------------------------------------------
+    # Reads
+    # --------------------------------------------------------
+    def query_free_busy(self, calendar_ids, time_min, time_max, timezone=TIMEZONE):
+        """
+        Busy intervals for many calendars without fetching event bodies.
+        Calendars are queried 50 per freeBusy request, and all requests go
+        out in one HTTP batch.
+
+        Returns (busy, errors):
+            busy   {calendar_id: [(start, end), ...]}   aware datetimes, sorted
+            errors {calendar_id: [error, ...]}          e.g. notFound
+        """
+        calendar_ids = list(calendar_ids)
+        chunks = [
+            calendar_ids[i:i + FREEBUSY_MAX_CALENDARS]
+            for i in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS)
+        ]
+        query = self.service.freebusy().query
+
+        def make_request(i):
+            return query(body={
+                "timeMin": _rfc3339(time_min, timezone),
+                "timeMax": _rfc3339(time_max, timezone),
+                "timeZone": timezone,
+                "items": [{"id": cal_id} for cal_id in chunks[i]],
+            })
+
+        results, failed = self._execute_batched(make_request, range(len(chunks)))
+
+        busy, errors = {}, {}
+        for i, chunk in enumerate(chunks):
+            if i in failed:
+                for cal_id in chunk:
+                    errors[cal_id] = [failed[i]]
+                continue
+            calendars = results[i].get("calendars", {})
+            for cal_id in chunk:
+                entry = calendars.get(cal_id, {})
+                if entry.get("errors"):
+                    errors[cal_id] = entry["errors"]
+                busy[cal_id] = sorted(
+                    (_parse_rfc3339(b["start"]), _parse_rfc3339(b["end"]))
+                    for b in entry.get("busy", [])
+                )
+        return busy, errors
+
+    def iter_event_pages(self, **params):
+        """
+        Yield raw events().list pages, following nextPageToken. The last page
+        carries nextSyncToken when the query allows incremental sync.
+        """
+        page_token = None
+        while True:
+            page = self.service.events().list(
+                calendarId=self.calendar_id, pageToken=page_token, **params
+            ).execute()
+            yield page
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return
+
+    def iter_events(self, **params):
+        """Stream every event matching events().list(**params), across all pages."""
+        for page in self.iter_event_pages(**params):
+            yield from page.get("items", [])
 
     def get_events_this_week(self):
         """Optional observer — returns real world events."""
-        now = datetime.datetime.utcnow()
-        start = now - datetime.timedelta(days=now.weekday())
-        end = start + datetime.timedelta(days=7)
-
-        events = self.service.events().list(
-            calendarId="primary",
-            timeMin=start.isoformat() + "Z",
-            timeMax=end.isoformat() + "Z",
-            singleEvents=True,
-            orderBy="startTime"
-        ).execute()
+        if self.event_cache is None:
+            self.event_cache = CalendarEventCache(self)
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        start = (now - datetime.timedelta(days=now.weekday())).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        return self.event_cache.events_between(start, start + datetime.timedelta(days=7))
+
+
+class CalendarEventCache:
+    """
+    Local copy of a calendar, kept current with incremental syncToken reads.
+
+    The first refresh() lists everything from `lookback_days` ago onward and
+    stores the nextSyncToken; later refreshes only fetch what changed since
+    (cancelled events are dropped). A 410 Gone means the token expired and
+    triggers one full resync. Refreshes closer together than `min_interval`
+    seconds are skipped entirely.
+    """
+
+    def __init__(self, calendar, lookback_days=30, min_interval=60.0):
+        self.calendar = calendar
+        self.lookback_days = lookback_days
+        self.min_interval = min_interval
+        self.events = {}            # event id -> event
+        self.sync_token = None
+        self.last_refresh = None
+        self._lock = threading.Lock()
+
+    def _apply_pages(self, pages):
+        token = None
+        for page in pages:
+            for event in page.get("items", []):
+                if event.get("status") == "cancelled":
+                    self.events.pop(event["id"], None)
+                else:
+                    self.events[event["id"]] = event
+            token = page.get("nextSyncToken", token)
+        return token
+
+    def _full_sync(self):
+        self.events = {}
+        since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=self.lookback_days)
+        return self._apply_pages(self.calendar.iter_event_pages(
+            timeMin=since.isoformat(), singleEvents=True
+        ))
+
+    def refresh(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if (not force and self.last_refresh is not None
+                    and now - self.last_refresh < self.min_interval):
+                return
+
+            if self.sync_token is None:
+                self.sync_token = self._full_sync()
+            else:
+                try:
+                    self.sync_token = self._apply_pages(self.calendar.iter_event_pages(
+                        syncToken=self.sync_token, singleEvents=True
+                    ))
+                except HttpError as exc:
+                    if exc.resp.status != 410:
+                        raise
+                    self.sync_token = self._full_sync()
+
+            self.last_refresh = now
 
-        return events.get("items", [])
+    def events_between(self, start, end, refresh=True):
+        """Cached events starting in [start, end), ordered by start time."""
+        if refresh:
+            self.refresh()
+        with self._lock:
+            starts = [(_event_start(e), e) for e in self.events.values()]
+        window = [pair for pair in starts if start <= pair[0] < end]
+        window.sort(key=lambda pair: pair[0])
+        return [event for _, event in window]
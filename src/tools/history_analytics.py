@@ -0,0 +1,176 @@
+# src/tools/history_analytics.py
+
+"""
+Weekly analytics over stored schedule history.
+
+Works on a flat blocks table (from ScheduleHistoryStore.iter_blocks or a
+Parquet export) with vectorized pandas group-bys, instead of calling
+evaluate_schedule() per week in a Python loop.
+
+Per (user, week):
+    sleep_hours           average sleep per night
+    late_night_hours      non-sleep time inside 23:00-05:00
+    scheduled_hours       total scheduled time
+    task_completion_rate  share of requested tasks present in the schedule
+plus rolling means of each over the previous `window` weeks.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.tools.evaluator import LATE_NIGHT_END, LATE_NIGHT_START
+
+BLOCK_COLUMNS = ["run_id", "user", "week", "day", "start_min", "end_min", "activity"]
+
+STAT_COLUMNS = ["sleep_hours", "late_night_hours", "scheduled_hours", "task_completion_rate"]
+
+
+# -----------------------------------------------------------
+# Loading
+# -----------------------------------------------------------
+
+def blocks_frame(store, user_id=None, since_week=None, until_week=None):
+    """Latest run's blocks per (user, week) as a typed DataFrame."""
+    df = pd.DataFrame.from_records(
+        store.iter_blocks(user_id=user_id, since_week=since_week, until_week=until_week),
+        columns=BLOCK_COLUMNS,
+    )
+    return df.astype({
+        "user": "category",
+        "week": "category",
+        "activity": "category",
+        "day": "int8",
+        "start_min": "int16",
+        "end_min": "int16",
+    })
+
+
+def runs_frame(store, user_id=None, since_week=None, until_week=None):
+    """
+    One row per (user, week) for the latest run with requested/missing task
+    counts, taken from the stored events and task_preservation result.
+    """
+    clauses, params = [], []
+    if user_id is not None:
+        clauses.append("user_id = ?")
+        params.append(user_id)
+    if since_week is not None:
+        clauses.append("week >= ?")
+        params.append(since_week)
+    if until_week is not None:
+        clauses.append("week <= ?")
+        params.append(until_week)
+
+    sql = (
+        "SELECT user_id, week, events_json, metrics_json FROM runs"
+        " WHERE id IN (SELECT MAX(id) FROM runs GROUP BY user_id, week)"
+    )
+    if clauses:
+        sql += " AND " + " AND ".join(clauses)
+
+    rows = []
+    for user, week, events_json, metrics_json in store.conn.execute(sql, params):
+        events = json.loads(events_json)
+        metrics = json.loads(metrics_json) if metrics_json else {}
+        requested = sum(len(tasks) for tasks in events.values())
+        missing = len(metrics.get("task_preservation", {}).get("missing_tasks", []))
+        rows.append((user, week, requested, missing))
+
+    return pd.DataFrame(rows, columns=["user", "week", "tasks_requested", "tasks_missing"])
+
+
+# -----------------------------------------------------------
+# Vectorized per-block measures
+# -----------------------------------------------------------
+
+def _block_measures(df):
+    start = df["start_min"].to_numpy(dtype=np.int32)
+    duration = (df["end_min"].to_numpy(dtype=np.int32) - start) % 1440
+    end = start + duration
+
+    # Label test runs once per distinct activity, then maps by code.
+    activity = df["activity"].astype("category")
+    sleep_by_code = activity.cat.categories.str.lower().str.contains("sleep")
+    is_sleep = np.asarray(sleep_by_code, dtype=bool)[activity.cat.codes.to_numpy()]
+
+    # A block spans at most two days, so three night windows relative to
+    # its own day cover every case (previous, same and next night).
+    late = np.zeros(len(df), dtype=np.int32)
+    night_len = (1440 - LATE_NIGHT_START) + LATE_NIGHT_END
+    for night_start in (LATE_NIGHT_START - 1440, LATE_NIGHT_START, LATE_NIGHT_START + 1440):
+        late += np.clip(
+            np.minimum(end, night_start + night_len) - np.maximum(start, night_start), 0, None
+        )
+    late[is_sleep] = 0
+
+    return duration, is_sleep, late
+
+
+# -----------------------------------------------------------
+# Statistics
+# -----------------------------------------------------------
+
+def activity_hours(blocks):
+    """Long table of hours per (user, week, activity)."""
+    duration, _, _ = _block_measures(blocks)
+    out = (
+        blocks.assign(hours=duration / 60.0)
+        .groupby(["user", "week", "activity"], observed=True)["hours"]
+        .sum()
+        .reset_index()
+    )
+    return out
+
+
+def weekly_stats(blocks, runs=None, window=4):
+    """
+    Per-(user, week) statistics with rolling means over `window` weeks.
+    runs: optional runs_frame() output for task_completion_rate.
+    """
+    duration, is_sleep, late = _block_measures(blocks)
+
+    frame = pd.DataFrame({
+        "user": blocks["user"].astype(str).to_numpy(),
+        "week": blocks["week"].astype(str).to_numpy(),
+        "scheduled_min": duration,
+        "sleep_min": np.where(is_sleep, duration, 0),
+        "late_min": late,
+    })
+
+    stats = frame.groupby(["user", "week"], sort=True).sum().reset_index()
+    stats["sleep_hours"] = stats.pop("sleep_min") / 60.0 / 7
+    stats["late_night_hours"] = stats.pop("late_min") / 60.0
+    stats["scheduled_hours"] = stats.pop("scheduled_min") / 60.0
+
+    if runs is not None and len(runs):
+        stats = stats.merge(runs, on=["user", "week"], how="left")
+        requested = stats.pop("tasks_requested")
+        missing = stats.pop("tasks_missing")
+        stats["task_completion_rate"] = np.where(
+            requested > 0, (requested - missing) / requested.where(requested > 0, 1), 1.0
+        )
+    else:
+        stats["task_completion_rate"] = np.nan
+
+    stats = stats.sort_values(["user", "week"], ignore_index=True)
+    rolling = (
+        stats.groupby("user", sort=False)[STAT_COLUMNS]
+        .rolling(window, min_periods=1)
+        .mean()
+        .reset_index(level=0, drop=True)
+    )
+    for col in STAT_COLUMNS:
+        stats[f"rolling_{col}"] = rolling[col]
+
+    return stats
+
+
+def history_stats(store, user_id=None, since_week=None, until_week=None, window=4):
+    """Convenience wrapper: load from the store and compute weekly_stats()."""
+    blocks = blocks_frame(store, user_id, since_week, until_week)
+    if blocks.empty:
+        return pd.DataFrame(columns=["user", "week"] + STAT_COLUMNS)
+    runs = runs_frame(store, user_id, since_week, until_week)
+    return weekly_stats(blocks, runs, window)
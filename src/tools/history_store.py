@@ -0,0 +1,254 @@
+# src/tools/history_store.py
+
+"""
+SQLite-backed schedule history.
+
+Every generated week is stored as a run (events dict, raw LLM output,
+final schedule text, evaluation results) plus one row per schedule
+block, indexed by user, ISO week and day so history queries are index
+lookups instead of regenerating schedules. The database runs in WAL
+mode so the dashboard can read while a batch of runs is being written.
+
+It also provides a durable key/value table for caching LLM responses.
+"""
+
+import datetime
+import hashlib
+import json
+import sqlite3
+import threading
+
+from src.tools.evaluator import DAYS, extract_day_blocks, parse_block_minutes
+
+DEFAULT_DB_PATH = "schedule_history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id            INTEGER PRIMARY KEY,
+    user_id       TEXT    NOT NULL,
+    week          TEXT    NOT NULL,   -- ISO week, e.g. '2026-W43'
+    created_at    TEXT    NOT NULL,
+    events_json   TEXT    NOT NULL,
+    raw_output    TEXT,
+    schedule_text TEXT    NOT NULL,
+    metrics_json  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_user_week ON runs (user_id, week);
+
+CREATE TABLE IF NOT EXISTS blocks (
+    run_id     INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    user_id    TEXT    NOT NULL,
+    week       TEXT    NOT NULL,
+    day        INTEGER NOT NULL,      -- 0 = Monday
+    start_min  INTEGER NOT NULL,
+    end_min    INTEGER NOT NULL,
+    activity   TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_blocks_user_week_day ON blocks (user_id, week, day);
+CREATE INDEX IF NOT EXISTS idx_blocks_run ON blocks (run_id);
+
+CREATE TABLE IF NOT EXISTS response_cache (
+    cache_key  TEXT PRIMARY KEY,
+    output     TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+
+def iso_week_key(date=None):
+    """date -> '2026-W43' (sorts correctly as text)."""
+    date = date or datetime.date.today()
+    year, week, _ = date.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def prompt_cache_key(prompt):
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def schedule_block_rows(schedule_text):
+    """Yield (day_index, start_min, end_min, activity) for each valid block."""
+    for day, blocks in extract_day_blocks(schedule_text).items():
+        d = DAYS.index(day)
+        for blk in blocks:
+            start, end, label = parse_block_minutes(blk)
+            if start is not None:
+                yield d, start, end, label
+
+
+class ScheduleHistoryStore:
+    """
+    store = ScheduleHistoryStore()
+    store.record_run("alice", events, schedule_text, raw_output, metrics)
+    store.latest_run("alice")
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --------------------------------------------------------
+    # Writes
+    # --------------------------------------------------------
+    def record_run(self, user_id, events, schedule_text,
+                   raw_output=None, metrics=None, week=None):
+        """Store one generated week and return its run id."""
+        return self.record_runs([{
+            "user_id": user_id,
+            "events": events,
+            "schedule_text": schedule_text,
+            "raw_output": raw_output,
+            "metrics": metrics,
+            "week": week,
+        }])[0]
+
+    def record_runs(self, records):
+        """
+        Store many runs in a single transaction.
+        Each record is a dict with user_id, events, schedule_text and
+        optionally raw_output, metrics and week (default: current ISO week).
+        """
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        run_ids = []
+
+        with self._lock, self.conn:
+            for rec in records:
+                week = rec.get("week") or iso_week_key()
+                cur = self.conn.execute(
+                    "INSERT INTO runs (user_id, week, created_at, events_json,"
+                    " raw_output, schedule_text, metrics_json)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        rec["user_id"],
+                        week,
+                        now,
+                        json.dumps(rec["events"]),
+                        rec.get("raw_output"),
+                        rec["schedule_text"],
+                        json.dumps(rec["metrics"]) if rec.get("metrics") is not None else None,
+                    ),
+                )
+                run_id = cur.lastrowid
+                run_ids.append(run_id)
+
+                self.conn.executemany(
+                    "INSERT INTO blocks (run_id, user_id, week, day, start_min, end_min, activity)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (run_id, rec["user_id"], week, d, start, end, label)
+                        for d, start, end, label in schedule_block_rows(rec["schedule_text"])
+                    ),
+                )
+
+        return run_ids
+
+    # --------------------------------------------------------
+    # Reads
+    # --------------------------------------------------------
+    @staticmethod
+    def _run_from_row(row):
+        run = dict(row)
+        run["events"] = json.loads(run.pop("events_json"))
+        metrics = run.pop("metrics_json")
+        run["metrics"] = json.loads(metrics) if metrics else None
+        return run
+
+    def get_runs(self, user_id, week=None, limit=None):
+        """Runs for a user (optionally one ISO week), newest first."""
+        sql = "SELECT * FROM runs WHERE user_id = ?"
+        params = [user_id]
+        if week:
+            sql += " AND week = ?"
+            params.append(week)
+        sql += " ORDER BY id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        return [self._run_from_row(r) for r in self.conn.execute(sql, params)]
+
+    def latest_run(self, user_id, week=None):
+        runs = self.get_runs(user_id, week, limit=1)
+        return runs[0] if runs else None
+
+    def list_weeks(self, user_id):
+        """ISO weeks with at least one run for this user, oldest first."""
+        rows = self.conn.execute(
+            "SELECT DISTINCT week FROM runs WHERE user_id = ? ORDER BY week", (user_id,)
+        )
+        return [r[0] for r in rows]
+
+    def iter_blocks(self, user_id=None, since_week=None, until_week=None,
+                    day=None, latest_only=True):
+        """
+        Stream block rows as tuples:
+            (run_id, user_id, week, day, start_min, end_min, activity)
+        latest_only keeps just the newest run per (user, week).
+        """
+        clauses, params = [], []
+        if user_id is not None:
+            clauses.append("b.user_id = ?")
+            params.append(user_id)
+        if since_week is not None:
+            clauses.append("b.week >= ?")
+            params.append(since_week)
+        if until_week is not None:
+            clauses.append("b.week <= ?")
+            params.append(until_week)
+        if day is not None:
+            clauses.append("b.day = ?")
+            params.append(day)
+        if latest_only:
+            clauses.append(
+                "b.run_id = (SELECT MAX(r.id) FROM runs r"
+                " WHERE r.user_id = b.user_id AND r.week = b.week)"
+            )
+
+        sql = (
+            "SELECT b.run_id, b.user_id, b.week, b.day, b.start_min, b.end_min, b.activity"
+            " FROM blocks b"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY b.user_id, b.week, b.day, b.start_min"
+
+        yield from self.conn.execute(sql, params)
+
+    # --------------------------------------------------------
+    # Durable LLM response cache
+    # --------------------------------------------------------
+    def cache_get(self, key, max_age=None):
+        """Cached output for key, or None if missing or older than max_age seconds."""
+        sql = "SELECT output FROM response_cache WHERE cache_key = ?"
+        params = [key]
+        if max_age is not None:
+            cutoff = datetime.datetime.now() - datetime.timedelta(seconds=max_age)
+            sql += " AND created_at >= ?"
+            params.append(cutoff.isoformat(timespec="seconds"))
+        row = self.conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def cache_put(self, key, output):
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO response_cache (cache_key, output, created_at)"
+                " VALUES (?, ?, ?)",
+                (key, output, now),
+            )
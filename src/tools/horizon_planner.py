@@ -0,0 +1,257 @@
+# src/tools/horizon_planner.py
+
+"""
+Multi-week (semester-horizon) planning engine.
+
+Plans N consecutive weeks from:
+    - dated one-off events          (date, start, end, label)
+    - recurring events              (weekdays, start, end, label, date range)
+    - recurrence rules              ("every weekday 7-8 Run", RRULE lines)
+    - busy intervals                (e.g. a calendar freeBusy query)
+    - weekly untimed tasks          (the usual events dict, every week)
+    - deadline tasks                (label, hours, due date) split into
+                                     work chunks across the weeks before it
+
+Everything is bucketed into per-week, per-day integer-minute lists once,
+so memory and time grow linearly with the number of weeks. Weeks that
+the deterministic pass places completely never reach the LLM; only
+weeks with leftovers are flagged as needing creative placement.
+"""
+
+import datetime
+
+from src.tools.event_parser import DAY_ALIASES, iter_occurrences, parse_recurring_line
+from src.tools.optimizer import (
+    DAY_START,
+    DEFAULT_SLEEP_START,
+    _duration_min,
+    _is_sleep,
+    _to_hhmm,
+    _to_min,
+    first_free_slot,
+)
+from src.tools.stream_parser import DAYS
+
+WORK_DAY_END = 21 * 60          # deadline work is kept before 21:00
+DEFAULT_CHUNK_HOURS = 2
+
+
+def _weekday_index(day):
+    """0-6, 'Monday', 'mon', 'Tues', ... -> weekday index."""
+    if isinstance(day, int):
+        return day
+    return DAYS.index(DAY_ALIASES[day.strip().lower()])
+
+
+class HorizonPlanner:
+    """
+    planner = HorizonPlanner(datetime.date(2026, 8, 17), weeks=16)
+    planner.add_recurring(["Mon", "Wed", "Fri"], "08:00", "09:00", "Gym")
+    planner.add_deadline("Term paper", 12, datetime.date(2026, 10, 2))
+    weeks = planner.plan()
+    planner.weeks_needing_llm(weeks)
+    """
+
+    def __init__(self, start_date, weeks, min_sleep=8):
+        # weeks are bucketed from start_date's Monday, but nothing is
+        # placed on the days before start_date itself
+        self.start_date = start_date
+        self.start = start_date - datetime.timedelta(days=start_date.weekday())
+        self.weeks = weeks
+        self.min_sleep = min_sleep
+        self.end = self.start + datetime.timedelta(weeks=weeks)
+
+        self.dated = []        # (date, start_min, duration_min, label)
+        self.recurring = []    # (weekday set, start_min, duration_min, label, first, last)
+        self.rules = []        # event_parser recurrence rules
+        self.weekly_events = {}
+        self.deadlines = []    # (due, earliest, label, minutes, chunk_minutes)
+
+    # --------------------------------------------------------
+    # Inputs
+    # --------------------------------------------------------
+    def add_event(self, date, start, end, label):
+        s, e = _to_min(start), _to_min(end)
+        self.dated.append((date, s, (e - s) % 1440, label))
+
+    def add_recurring(self, weekdays, start, end, label, first_date=None, last_date=None):
+        """weekdays: names ('Monday', 'Tue') or indexes (0 = Monday)."""
+        s, e = _to_min(start), _to_min(end)
+        days = {_weekday_index(d) for d in weekdays}
+        self.recurring.append((days, s, (e - s) % 1440, label, first_date, last_date))
+
+    def add_rule(self, rule):
+        """
+        A recurrence rule from event_parser.parse_recurring_line(), or the
+        line itself ("every weekday 7-8 Run", "RRULE:FREQ=WEEKLY;..."). It is
+        expanded lazily, one planned week at a time.
+        """
+        if isinstance(rule, str):
+            rule = parse_recurring_line(rule)
+            if rule is None:
+                raise ValueError("Not a recurring event line")
+        self.rules.append(rule)
+
+    def add_busy(self, intervals, label="Busy", timezone=None):
+        """
+        Hard constraints from (start, end) datetime pairs, e.g. the busy lists
+        returned by GoogleCalendarService.query_free_busy(). Aware datetimes
+        are converted to `timezone` (a tzinfo); intervals crossing midnight
+        are split per day.
+        """
+        for start, end in intervals:
+            if timezone is not None and start.tzinfo is not None:
+                start, end = start.astimezone(timezone), end.astimezone(timezone)
+            while start < end:
+                midnight = datetime.datetime.combine(
+                    start.date() + datetime.timedelta(days=1), datetime.time(), start.tzinfo
+                )
+                stop = min(end, midnight)
+                s = start.hour * 60 + start.minute
+                self.dated.append((start.date(), s, (stop - start) // datetime.timedelta(minutes=1), label))
+                start = stop
+
+    def add_weekly_events(self, events):
+        """Untimed tasks repeated every week: {"Monday": [("Study", 2), ...]}."""
+        self.weekly_events = events
+
+    def add_deadline(self, label, hours, due_date, earliest_date=None,
+                     chunk_hours=DEFAULT_CHUNK_HOURS):
+        self.deadlines.append((
+            due_date,
+            earliest_date or self.start_date,
+            label,
+            _duration_min(hours),
+            _duration_min(chunk_hours),
+        ))
+
+    # --------------------------------------------------------
+    # Planning
+    # --------------------------------------------------------
+    def _week_of(self, date):
+        return (date - self.start).days // 7
+
+    def _date_of(self, week, day):
+        return self.start + datetime.timedelta(days=week * 7 + day)
+
+    def _first_day(self):
+        """Index (from self.start) of the first day items may be placed on."""
+        return (self.start_date - self.start).days
+
+    def plan(self):
+        """
+        Returns one dict per week:
+            {"week_start": date,
+             "schedule":   {day: [(start, end, activity), ...]},
+             "events":     {day: [(activity, hours), ...]}   # for an LLM prompt
+             "unplaced":   [(day, activity, hours), ...],
+             "needs_llm":  bool}
+        """
+        # occupied[w][d] = [(start_min, duration_min, label), ...]
+        occupied = [[[] for _ in DAYS] for _ in range(self.weeks)]
+        unplaced = [[] for _ in range(self.weeks)]
+
+        # 1. fixed items: dated events and recurring occurrences
+        for date, s, dur, label in self.dated:
+            if self.start_date <= date < self.end:
+                occupied[self._week_of(date)][date.weekday()].append((s, dur, label))
+
+        for days, s, dur, label, first, last in self.recurring:
+            for w in range(self.weeks):
+                for d in days:
+                    date = self._date_of(w, d)
+                    if date < self.start_date:
+                        continue
+                    if (first is None or date >= first) and (last is None or date <= last):
+                        occupied[w][d].append((s, dur, label))
+
+        for rule in self.rules:
+            for w in range(self.weeks):
+                week_start = self._date_of(w, 0)
+                for date, s, e, label in iter_occurrences(
+                    rule, max(week_start, self.start_date), week_start + datetime.timedelta(days=7)
+                ):
+                    occupied[w][date.weekday()].append((s, (e - s) % 1440, label))
+
+        # 2. sleep and weekly tasks, placed around the fixed items
+        sleep_len = int(self.min_sleep * 60)
+        for w in range(self.weeks):
+            for d, day in enumerate(DAYS):
+                if w * 7 + d < self._first_day():
+                    continue
+                slots = occupied[w][d]
+                tasks = self.weekly_events.get(day, [])
+
+                if not any(_is_sleep(lbl) for _, _, lbl in slots) and not any(
+                    _is_sleep(act) for act, _ in tasks
+                ):
+                    slots.append((DEFAULT_SLEEP_START, sleep_len, "Sleep"))
+
+                for activity, hours in tasks:
+                    dur = _duration_min(hours)
+                    if _is_sleep(activity):
+                        # runs past midnight, so it can't go through the slot
+                        # search; fixed at 21:00 as in optimizer.draft_schedule
+                        slots.append((DEFAULT_SLEEP_START, dur, activity))
+                        continue
+                    start = first_free_slot([(s, du) for s, du, _ in slots], dur, DAY_START)
+                    if start is None:
+                        unplaced[w].append((day, activity, hours))
+                    else:
+                        slots.append((start, dur, activity))
+
+        # 3. deadlines, earliest due first, chunked into free work-day slots
+        for due, earliest, label, remaining, chunk in sorted(self.deadlines):
+            first_day = max((earliest - self.start).days, self._first_day())
+            last_day = min((due - self.start).days, self.weeks * 7 - 1)
+
+            for absolute_day in range(first_day, last_day + 1):
+                if remaining <= 0:
+                    break
+                w, d = divmod(absolute_day, 7)
+                slots = occupied[w][d]
+                size = min(chunk, remaining)
+                start = first_free_slot([(s, du) for s, du, _ in slots], size, DAY_START, WORK_DAY_END)
+                if start is not None:
+                    slots.append((start, size, label))
+                    remaining -= size
+
+            if remaining > 0:
+                w = min(max(self._week_of(due), 0), self.weeks - 1)
+                d = min(max((due - self.start).days - w * 7, 0), 6)
+                unplaced[w].append((DAYS[d], label, remaining / 60.0))
+
+        # 4. assemble
+        result = []
+        for w in range(self.weeks):
+            schedule, events = {}, {}
+            for d, day in enumerate(DAYS):
+                slots = sorted(occupied[w][d])
+                schedule[day] = [(_to_hhmm(s), _to_hhmm(s + du), lbl) for s, du, lbl in slots]
+                events[day] = [(lbl, du / 60.0) for s, du, lbl in slots]
+            for day, activity, hours in unplaced[w]:
+                events[day].append((activity, hours))
+
+            result.append({
+                "week_start": self._date_of(w, 0),
+                "schedule": schedule,
+                "events": events,
+                "unplaced": unplaced[w],
+                "needs_llm": bool(unplaced[w] or _has_overlap(occupied[w])),
+            })
+        return result
+
+    @staticmethod
+    def weeks_needing_llm(plan):
+        """Only these weeks should be sent to the agent."""
+        return [week for week in plan if week["needs_llm"]]
+
+
+def _has_overlap(week_slots):
+    """True if any fixed items collide on the week's minute axis."""
+    spans = sorted(
+        (d * 1440 + s, d * 1440 + s + dur)
+        for d, slots in enumerate(week_slots)
+        for s, dur, _ in slots
+    )
+    return any(spans[i][1] > spans[i + 1][0] for i in range(len(spans) - 1))
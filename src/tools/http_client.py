@@ -0,0 +1,97 @@
+# src/tools/http_client.py
+
+"""
+Shared outbound HTTP client.
+
+One process-wide requests.Session with keep-alive connection pools, so
+repeated calls to the same host reuse TCP/TLS connections instead of
+opening a new one per request, and gzip-compressed responses.
+
+get_json() also revalidates: the ETag / Last-Modified of each response
+is remembered per URL and sent back as If-None-Match / If-Modified-Since,
+so an unchanged resource costs a bodiless 304 and the cached JSON is
+returned.
+"""
+
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_CONNECTIONS = 16      # distinct hosts kept pooled
+POOL_MAXSIZE = 32          # connections per host (>= concurrent observer threads)
+MAX_VALIDATORS = 512       # URLs whose ETag/Last-Modified + body are remembered
+
+USER_AGENT = "weekly-schedule-agent/1.0"
+
+_session = None
+_session_lock = threading.Lock()
+
+_validators = OrderedDict()    # url -> (etag, last_modified, json)
+_validators_lock = threading.Lock()
+
+
+def get_session():
+    """The shared pooled session (created on first use)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "Accept-Encoding": "gzip, deflate",
+                    "User-Agent": USER_AGENT,
+                })
+                _session = session
+    return _session
+
+
+def _request_key(url, params):
+    if not params:
+        return url
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+def get_json(url, params=None, timeout=None, headers=None):
+    """
+    GET a JSON resource over the shared session with conditional
+    revalidation. Raises requests exceptions like requests.get() would.
+    """
+    key = _request_key(url, params)
+    headers = dict(headers or {})
+
+    with _validators_lock:
+        cached = _validators.get(key)
+    if cached is not None:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    resp = get_session().get(url, params=params, timeout=timeout, headers=headers)
+
+    if resp.status_code == 304 and cached is not None:
+        with _validators_lock:
+            _validators.move_to_end(key)
+        return cached[2]
+
+    data = resp.json()
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if resp.ok and (etag or last_modified):
+        with _validators_lock:
+            _validators[key] = (etag, last_modified, data)
+            _validators.move_to_end(key)
+            while len(_validators) > MAX_VALIDATORS:
+                _validators.popitem(last=False)
+    return data
+
+
+def clear_validators():
+    with _validators_lock:
+        _validators.clear()
@@ -0,0 +1,291 @@
+# src/tools/ical.py
+
+"""
+Streaming iCalendar (.ics, RFC 5545) import and export.
+
+Reading unfolds lines and yields one VEVENT at a time; writing emits
+one VEVENT at a time. Neither direction holds the whole calendar in
+memory, so large calendar dumps can be piped straight through.
+"""
+
+import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from src.tools.stream_parser import DAYS, iter_stream_blocks
+
+PRODID = "-//FAIR Weekly Agent//Schedule Export//EN"
+DEFAULT_TIMEZONE = "America/Denver"
+
+_ESCAPES = [("\\", "\\\\"), (";", "\\;"), (",", "\\,"), ("\n", "\\n")]
+
+
+# -------------------------------------------------------
+# Reading
+# -------------------------------------------------------
+
+def iter_unfolded_lines(lines):
+    """Join RFC 5545 continuation lines (those starting with space/tab)."""
+    current = None
+    for raw in lines:
+        raw = raw.rstrip("\r\n")
+        if raw[:1] in (" ", "\t") and current is not None:
+            current += raw[1:]
+            continue
+        if current is not None:
+            yield current
+        current = raw
+    if current is not None:
+        yield current
+
+
+def _unescape(value):
+    out = []
+    chars = iter(value)
+    for ch in chars:
+        if ch == "\\":
+            nxt = next(chars, "")
+            out.append("\n" if nxt in ("n", "N") else nxt)
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _is_all_day(params, value):
+    return params.get("VALUE") == "DATE" or len(value) == 8
+
+
+def _parse_ics_value(value, params):
+    """
+    DTSTART/DTEND value -> datetime in its own zone: aware UTC for '...Z',
+    aware in TZID when that zone is known, naive for floating times and
+    all-day '20261019' dates.
+    """
+    if _is_all_day(params, value):
+        return datetime.datetime.strptime(value[:8], "%Y%m%d")
+
+    if value.endswith("Z"):
+        utc = datetime.datetime.strptime(value, "%Y%m%dT%H%M%SZ")
+        return utc.replace(tzinfo=datetime.timezone.utc)
+
+    local = datetime.datetime.strptime(value[:15], "%Y%m%dT%H%M%S")
+    try:
+        return local.replace(tzinfo=ZoneInfo(params["TZID"]))
+    except (KeyError, ValueError, ZoneInfoNotFoundError):
+        # no TZID, or a non-IANA one (e.g. Outlook's "Eastern Standard Time")
+        return local
+
+
+def _to_timezone(dt, timezone):
+    """Aware datetimes -> naive wall time in `timezone`; floating ones pass through."""
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(ZoneInfo(timezone)).replace(tzinfo=None)
+
+
+def parse_ics_datetime(value, params=None, timezone=DEFAULT_TIMEZONE):
+    """
+    DTSTART/DTEND value -> naive datetime in the planner's timezone.
+    '20261019T140000Z' and TZID=... values are converted to `timezone`;
+    floating '20261019T080000' and all-day '20261019' are taken as-is.
+    """
+    return _to_timezone(_parse_ics_value(value, params or {}), timezone)
+
+
+def iter_vevents(lines):
+    """
+    Yield each VEVENT as {NAME: (params, value)} from an iterable of raw
+    .ics lines (an open file works). Only the current event is buffered.
+    """
+    event = None
+    depth = 0
+
+    for line in iter_unfolded_lines(lines):
+        if not line:
+            continue
+
+        head, _, value = line.partition(":")
+        name, *raw_params = head.split(";")
+        name = name.upper()
+
+        if name == "BEGIN":
+            if value.upper() == "VEVENT":
+                event, depth = {}, 0
+            elif event is not None:
+                depth += 1   # nested component such as VALARM
+            continue
+
+        if name == "END":
+            if value.upper() == "VEVENT" and event is not None:
+                yield event
+                event = None
+            elif event is not None:
+                depth -= 1
+            continue
+
+        if event is None or depth or name in event:
+            continue
+
+        params = {}
+        for p in raw_params:
+            key, _, val = p.partition("=")
+            params[key.upper()] = val.strip('"')
+        event[name] = (params, _unescape(value))
+
+
+def _iter_rrule_starts(spec, start, window_start, window_end, timezone):
+    """
+    Start datetimes (in the event's own zone) of a VEVENT's RRULE occurring
+    around [window_start, window_end). Rules the user-text engine can't
+    expand (MONTHLY, YEARLY, ...) and open-ended rules without a
+    window_end yield only the first instance.
+    """
+    # imported here: event_parser imports this module
+    from src.tools.event_parser import iter_occurrences, parse_rrule
+
+    try:
+        rule = parse_rrule(spec, dtstart=start.date())
+    except ValueError:
+        yield start
+        return
+    if window_end is None and rule["until"] is None and rule["count"] is None:
+        yield start
+        return
+
+    rule.update(start_min=0, end_min=0, activity="")
+    # the window is in the planner's timezone; pad a day for zone offsets
+    first = window_start.date() - datetime.timedelta(days=1) if window_start else start.date()
+    last = window_end.date() + datetime.timedelta(days=2) if window_end else datetime.date.max
+    for day, *_ in iter_occurrences(rule, first, last):
+        yield datetime.datetime.combine(day, start.time(), start.tzinfo)
+
+
+def iter_ics_events(lines, window_start=None, window_end=None, include_all_day=False,
+                    timezone=DEFAULT_TIMEZONE):
+    """
+    Yield (start, end, summary) naive datetimes in `timezone` for each
+    timed VEVENT, optionally restricted to events starting in
+    [window_start, window_end).
+
+    UTC and TZID times are converted to `timezone`. Weekly and daily
+    RRULEs are expanded over the window; EXDATE and RECURRENCE-ID
+    overrides are not applied. All-day (VALUE=DATE) events are skipped
+    unless include_all_day is set.
+    """
+    for event in iter_vevents(lines):
+        if "DTSTART" not in event:
+            continue
+        params, value = event["DTSTART"]
+        if not include_all_day and _is_all_day(params, value):
+            continue
+
+        start = _parse_ics_value(value, params)
+        if "DTEND" in event:
+            duration = _parse_ics_value(event["DTEND"][1], event["DTEND"][0]) - start
+        else:
+            duration = datetime.timedelta(0)
+
+        summary = event.get("SUMMARY", ({}, ""))[1].strip() or "Task"
+
+        if "RRULE" in event:
+            starts = _iter_rrule_starts(event["RRULE"][1], start, window_start, window_end, timezone)
+        else:
+            starts = [start]
+
+        for occurrence in starts:
+            local_start = _to_timezone(occurrence, timezone)
+            if window_start is not None and local_start < window_start:
+                continue
+            if window_end is not None and local_start >= window_end:
+                continue
+            yield local_start, _to_timezone(occurrence + duration, timezone), summary
+
+
+# -------------------------------------------------------
+# Writing
+# -------------------------------------------------------
+
+def _escape(value):
+    for raw, escaped in _ESCAPES:
+        value = value.replace(raw, escaped)
+    return value
+
+
+def _fold(line):
+    """Fold a content line at 75 octets as RFC 5545 requires."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    limit = 75
+    while len(data) > limit:
+        cut = limit
+        # never split inside a multi-byte character
+        while cut and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+        limit = 74  # continuation lines start with a space
+    parts.append(data.decode("utf-8"))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _fmt(dt):
+    return dt.strftime("%Y%m%dT%H%M%S")
+
+
+def current_week_start(today=None):
+    """Monday of the current week."""
+    today = today or datetime.date.today()
+    return today - datetime.timedelta(days=today.weekday())
+
+
+def iter_schedule_ics(schedule, week_start=None, timezone=DEFAULT_TIMEZONE):
+    """
+    Yield .ics text chunks for a schedule, one VEVENT per block.
+
+    schedule: schedule text, or any iterable of text chunks/lines
+              (e.g. an open file or a model token stream).
+    week_start: date of the Monday the schedule belongs to.
+    """
+    week_start = week_start or current_week_start()
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    chunks = [schedule] if isinstance(schedule, str) else schedule
+
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+    yield _fold(f"PRODID:{PRODID}")
+    yield _fold(f"X-WR-TIMEZONE:{timezone}")
+
+    for n, (day, start, end, activity) in enumerate(iter_stream_blocks(chunks)):
+        date = week_start + datetime.timedelta(days=DAYS.index(day))
+        base = datetime.datetime(date.year, date.month, date.day)
+
+        sh, sm = map(int, start.split(":"))
+        eh, em = map(int, end.split(":"))
+        start_dt = base + datetime.timedelta(hours=sh, minutes=sm)
+        end_dt = base + datetime.timedelta(hours=eh, minutes=em)
+        if end_dt <= start_dt:
+            end_dt += datetime.timedelta(days=1)  # rolls past midnight
+
+        yield (
+            "BEGIN:VEVENT\r\n"
+            + _fold(f"UID:{_fmt(start_dt)}-{n}@fair-weekly-agent")
+            + f"DTSTAMP:{stamp}\r\n"
+            + f"DTSTART:{_fmt(start_dt)}\r\n"
+            + f"DTEND:{_fmt(end_dt)}\r\n"
+            + _fold(f"SUMMARY:{_escape(activity)}")
+            + "END:VEVENT\r\n"
+        )
+
+    yield "END:VCALENDAR\r\n"
+
+
+def write_schedule_ics(schedule, fp, week_start=None, timezone=DEFAULT_TIMEZONE):
+    """Stream a schedule into an open text file (newline='' recommended)."""
+    for chunk in iter_schedule_ics(schedule, week_start, timezone):
+        fp.write(chunk)
+
+
+def schedule_to_ics(schedule_text, week_start=None, timezone=DEFAULT_TIMEZONE):
+    """Whole .ics document as a string (for small, single-week downloads)."""
+    return "".join(iter_schedule_ics(schedule_text, week_start, timezone))
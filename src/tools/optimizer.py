@@ -1,12 +1,563 @@
 # src/tools/optimizer.py
 
-def optimize_schedule(parsed_schedule):
+"""
+Local-search schedule optimizer.
+
+Starts from a draft week (usually the LLM's output) and improves it with
+simulated annealing plus a short tabu list. Moves are:
+    - shift a block earlier/later on its day
+    - swap two blocks on the same day
+    - split a block in two and shift the second half
+
+The objective is a sum of per-block terms (late-night work, sleep
+window), pairwise overlap terms and per-day terms (unusable free-time
+slivers between consecutive blocks, extra pieces of split activities).
+A move touches one day, so it is scored by the change in the moved
+blocks' unary and overlap terms against their neighbours on the same and
+adjacent days plus that one day's term, never by rescoring the week.
+That keeps it at thousands of moves per second.
+"""
+
+import math
+import os
+import random
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from src.tools.evaluator import (
+    LATE_NIGHT_END,
+    LATE_NIGHT_START,
+    MIN_USEFUL_GAP,
+)
+from src.tools.stream_parser import DAYS, iter_stream_blocks
+
+# Objective weights (per minute)
+W_OVERLAP = 10.0
+W_LATE_NIGHT = 3.0
+W_SLEEP_WINDOW = 2.0
+W_FRAGMENT = 1.0
+W_SPLIT = 30.0          # per extra piece of the same activity on a day
+
+# Sleep should start between these times (minutes of day)
+SLEEP_EARLIEST = 20 * 60
+SLEEP_LATEST = 24 * 60
+
+# Deterministic draft placement
+DAY_START = 8 * 60
+DEFAULT_SLEEP_START = 21 * 60
+
+SHIFT_STEPS = (15, 30, 60, 120)
+MIN_SPLIT = 60          # only blocks at least this long are split
+MAX_BLOCKS_PER_DAY = 16
+
+
+# -----------------------------------------------------------
+# Conversion helpers
+# -----------------------------------------------------------
+
+def _to_min(hhmm):
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+def _to_hhmm(minutes):
+    minutes %= 1440
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def parse_schedule_text(schedule_text):
+    """Schedule text -> {day: [(start, end, activity), ...]} for every day."""
+    parsed = {day: [] for day in DAYS}
+    for day, start, end, activity in iter_stream_blocks([schedule_text]):
+        parsed[day].append((start, end, activity))
+    return parsed
+
+
+def format_schedule(parsed_schedule):
+    """{day: [(start, end, activity), ...]} -> schedule text in agent format."""
+    lines = []
+    for day in DAYS:
+        lines.append(f"{day}:")
+        for start, end, activity in parsed_schedule.get(day, []):
+            lines.append(f"    {start}-{end}-{activity}")
+    return "\n".join(lines)
+
+
+def _is_sleep(label):
+    return "sleep" in label.lower()
+
+
+# -----------------------------------------------------------
+# Objective terms
+# -----------------------------------------------------------
+# A block is [start_min, duration_min, label] on day index d; its absolute
+# interval on the week axis is [d*1440 + start, d*1440 + start + duration).
+
+def _unary_cost(day_idx, block):
+    start, duration, label = block
+
+    if _is_sleep(label):
+        if SLEEP_EARLIEST <= start < SLEEP_LATEST:
+            return 0.0
+        early = (SLEEP_EARLIEST - start) % 1440
+        late = (start - SLEEP_LATEST) % 1440
+        return W_SLEEP_WINDOW * min(early, late)
+
+    end = start + duration
+    night_len = (1440 - LATE_NIGHT_START) + LATE_NIGHT_END
+    late = 0
+    for night_start in (LATE_NIGHT_START - 1440, LATE_NIGHT_START, LATE_NIGHT_START + 1440):
+        late += max(0, min(end, night_start + night_len) - max(start, night_start))
+    return W_LATE_NIGHT * late
+
+
+def _pair_cost(day_a, a, day_b, b):
+    sa = day_a * 1440 + a[0]
+    ea = sa + a[1]
+    sb = day_b * 1440 + b[0]
+    eb = sb + b[1]
+
+    overlap = min(ea, eb) - max(sa, sb)
+    return W_OVERLAP * overlap if overlap > 0 else 0.0
+
+
+def _day_cost(blocks):
+    """
+    Free-time slivers shorter than MIN_USEFUL_GAP between consecutive blocks
+    of the day (in start order), plus W_SPLIT for every block whose
+    activity already appears earlier that day.
     """
-    Placeholder hook for SciPy or linear optimization.
-    You can add:
+    cost = 0.0
+    busy_until = None
+    for start, duration, _ in sorted(blocks, key=lambda b: b[0]):
+        if busy_until is not None and 0 < start - busy_until < MIN_USEFUL_GAP:
+            cost += W_FRAGMENT * (start - busy_until)
+        end = start + duration
+        busy_until = end if busy_until is None else max(busy_until, end)
+
+    labels = [b[2].lower() for b in blocks]
+    return cost + W_SPLIT * (len(labels) - len(set(labels)))
+
+
+def _neighbours(week, day_idx, exclude):
+    """Blocks on this and adjacent days, minus the ones being moved."""
+    for d in (day_idx - 1, day_idx, day_idx + 1):
+        if 0 <= d < len(DAYS):
+            for blk in week[d]:
+                if not any(blk is x for x in exclude):
+                    yield d, blk
+
+
+def _move_delta(week, day_idx, removed, added):
+    """Objective change from replacing `removed` blocks with `added` on one day."""
+    delta = 0.0
+    for blk in added:
+        delta += _unary_cost(day_idx, blk)
+    for blk in removed:
+        delta -= _unary_cost(day_idx, blk)
+
+    for d, other in _neighbours(week, day_idx, removed):
+        for blk in added:
+            delta += _pair_cost(day_idx, blk, d, other)
+        for blk in removed:
+            delta -= _pair_cost(day_idx, blk, d, other)
+
+    for i in range(len(added)):
+        for j in range(i + 1, len(added)):
+            delta += _pair_cost(day_idx, added[i], day_idx, added[j])
+    for i in range(len(removed)):
+        for j in range(i + 1, len(removed)):
+            delta -= _pair_cost(day_idx, removed[i], day_idx, removed[j])
+
+    new_day = [b for b in week[day_idx] if not any(b is r for r in removed)] + added
+    delta += _day_cost(new_day) - _day_cost(week[day_idx])
+    return delta
+
+
+def week_cost(week):
+    """Full objective (used once at start and for reporting)."""
+    total = sum(_day_cost(day) for day in week)
+    flat = [(d, blk) for d in range(len(DAYS)) for blk in week[d]]
+    for i, (d, blk) in enumerate(flat):
+        total += _unary_cost(d, blk)
+        for d2, other in flat[i + 1:]:
+            if abs(d2 - d) <= 1:
+                total += _pair_cost(d, blk, d2, other)
+    return total
+
+
+def schedule_cost(parsed_schedule):
+    """Objective value of a parsed schedule (lower is better)."""
+    return week_cost(_to_week(parsed_schedule, min_sleep=None))
+
+
+# -----------------------------------------------------------
+# Moves
+# -----------------------------------------------------------
+
+def _propose(week, rng, fixed, pinned):
+    """Return (day_idx, removed, added) or None."""
+    day_idx = rng.randrange(len(DAYS))
+    movable = [
+        b for b in week[day_idx]
+        if b[2].lower() not in fixed and id(b) not in pinned
+    ]
+    if not movable:
+        return None
+
+    kind = rng.random()
+
+    if kind < 0.6 or len(movable) < 2:
+        blk = rng.choice(movable)
+        step = rng.choice(SHIFT_STEPS) * rng.choice((-1, 1))
+        new_start = blk[0] + step
+        if not 0 <= new_start < 1440:
+            return None
+        return day_idx, [blk], [[new_start, blk[1], blk[2]]]
+
+    if kind < 0.85:
+        a, b = rng.sample(movable, 2)
+        if a[0] > b[0]:
+            a, b = b, a
+        # b takes a's start, a ends where b used to end
+        new_b = a[0]
+        new_a = b[0] + b[1] - a[1]
+        if not 0 <= new_a < 1440:
+            return None
+        return day_idx, [a, b], [[new_a, a[1], a[2]], [new_b, b[1], b[2]]]
+
+    if len(week[day_idx]) >= MAX_BLOCKS_PER_DAY:
+        return None
+    blk = rng.choice(movable)
+    if blk[1] < MIN_SPLIT:
+        return None
+    first = (blk[1] // 2) // 15 * 15
+    second_start = blk[0] + first + rng.choice(SHIFT_STEPS)
+    if not 0 <= second_start < 1440:
+        return None
+    return day_idx, [blk], [[blk[0], first, blk[2]], [second_start, blk[1] - first, blk[2]]]
+
+
+def _to_week(parsed_schedule, min_sleep):
+    week = [[] for _ in DAYS]
+    for day, blocks in parsed_schedule.items():
+        if day not in DAYS:
+            continue
+        d = DAYS.index(day)
+        for start, end, label in blocks:
+            s, e = _to_min(start), _to_min(end)
+            duration = (e - s) % 1440
+            # enforce the sleep minimum up front; the search resolves overlaps
+            if min_sleep is not None and _is_sleep(label):
+                duration = max(duration, int(min_sleep * 60))
+            week[d].append([s, duration, label])
+    return week
+
+
+def _from_week(week):
+    parsed = {}
+    for d, day in enumerate(DAYS):
+        merged = []
+        for s, dur, label in sorted(week[d], key=lambda b: b[0]):
+            # re-join split halves that ended up back to back
+            if merged and merged[-1][2] == label and merged[-1][0] + merged[-1][1] == s:
+                merged[-1][1] += dur
+            else:
+                merged.append([s, dur, label])
+
+        parsed[day] = [(_to_hhmm(s), _to_hhmm(s + dur), label) for s, dur, label in merged]
+    return parsed
+
+
+# -----------------------------------------------------------
+# Optimizer
+# -----------------------------------------------------------
+
+def optimize_schedule(parsed_schedule, min_sleep=8, iterations=5000, seed=0,
+                      fixed_labels=(), start_temp=20.0, end_temp=0.1, tabu_size=8,
+                      prior=None):
+    """
+    Improve a draft schedule by local search.
+
+    parsed_schedule: {day: [(start, end, activity), ...]} or schedule text;
+                     the result has the same form.
+    fixed_labels:    activity names that must not be moved
+    prior:           warm start — last week's accepted schedule (parsed or
+                     text). Blocks identical to a prior block stay put and
+                     only the changed ones are re-placed.
+    Goals (see weights above):
         - minimize total task overlap
-        - maximize leisure time
+        - maximize leisure time (no unusable sub-30-minute gaps)
         - minimize late-night work
         - enforce sleep windows
     """
-    return parsed_schedule
+    as_text = isinstance(parsed_schedule, str)
+    if as_text:
+        parsed_schedule = parse_schedule_text(parsed_schedule)
+
+    rng = random.Random(seed)
+    fixed = {label.lower() for label in fixed_labels}
+    week = _to_week(parsed_schedule, min_sleep)
+    pinned = _pinned_blocks(week, prior)
+
+    cost = week_cost(week)
+    best_cost = cost
+    best = [[list(b) for b in day] for day in week]
+    tabu = deque(maxlen=tabu_size)
+
+    if iterations > 0 and cost > 0:
+        cooling = (end_temp / start_temp) ** (1.0 / iterations)
+        temp = start_temp
+
+        for _ in range(iterations):
+            temp *= cooling
+            move = _propose(week, rng, fixed, pinned)
+            if move is None:
+                continue
+
+            day_idx, removed, added = move
+            delta = _move_delta(week, day_idx, removed, added)
+
+            touched = {(day_idx, b[2]) for b in removed}
+            is_tabu = any(t in tabu for t in touched)
+            if is_tabu and cost + delta >= best_cost:
+                continue   # aspiration: tabu moves only if they beat the best
+
+            if delta <= 0 or rng.random() < math.exp(-delta / temp):
+                week[day_idx] = [
+                    b for b in week[day_idx] if not any(b is r for r in removed)
+                ] + added
+                cost += delta
+                tabu.extend(touched)
+
+                if cost < best_cost - 1e-9:
+                    best_cost = cost
+                    best = [[list(b) for b in d] for d in week]
+                    if best_cost <= 0:
+                        break
+
+    result = _from_week(best)
+    return format_schedule(result) if as_text else result
+
+
+# -----------------------------------------------------------
+# Deterministic drafts
+# -----------------------------------------------------------
+
+def _pinned_blocks(week, prior):
+    """ids of working blocks that exactly match a block of the prior week."""
+    if prior is None:
+        return set()
+    if isinstance(prior, str):
+        prior = parse_schedule_text(prior)
+
+    pinned = set()
+    for d, day in enumerate(DAYS):
+        remaining = [
+            (_to_min(s), (_to_min(e) - _to_min(s)) % 1440, label)
+            for s, e, label in prior.get(day, [])
+        ]
+        for blk in week[d]:
+            key = (blk[0], blk[1], blk[2])
+            if key in remaining:
+                remaining.remove(key)
+                pinned.add(id(blk))
+    return pinned
+
+
+def _duration_min(hours):
+    return max(15, int(round(float(hours) * 4)) * 15)
+
+
+def _match_prior(day_events, prior_blocks):
+    """
+    Split one day's events into prior blocks that can be reused as-is and
+    events that need new placement. An activity is reused when its total
+    requested minutes equal the total minutes of its prior blocks, so an
+    activity the planner split or merged still matches.
+    Returns (kept_blocks, new_events, unused_prior_blocks).
+    """
+    requested, prior_by_label = {}, {}
+    for activity, hours in day_events:
+        key = activity.lower()
+        requested[key] = requested.get(key, 0) + _duration_min(hours)
+    for blk in prior_blocks:
+        start, end, label = blk
+        entry = prior_by_label.setdefault(label.lower(), [0, []])
+        entry[0] += (_to_min(end) - _to_min(start)) % 1440
+        entry[1].append(blk)
+
+    kept, unused, reused = [], [], set()
+    for label, (minutes, blocks) in prior_by_label.items():
+        if requested.get(label) == minutes:
+            kept.extend(blocks)
+            reused.add(label)
+        else:
+            unused.extend(blocks)
+
+    new_events = [(a, h) for a, h in day_events if a.lower() not in reused]
+    return kept, new_events, unused
+
+
+def warm_start_deltas(events, prior):
+    """Events that do not match a block of the prior week: [(day, activity, hours)]."""
+    if isinstance(prior, str):
+        prior = parse_schedule_text(prior)
+
+    deltas = []
+    for day in DAYS:
+        _, new_events, _ = _match_prior(events.get(day, []), prior.get(day, []))
+        deltas.extend((day, activity, hours) for activity, hours in new_events)
+    return deltas
+
+
+def first_free_slot(occupied, duration, earliest, latest=1440):
+    """
+    Earliest 15-minute-aligned start >= earliest, ending by `latest`, that
+    does not overlap any (start, duration) in `occupied`.
+    """
+    spans = []
+    for s, dur in occupied:
+        spans.append((s, s + dur))
+        if s + dur > 1440:
+            spans.append((s - 1440, s + dur - 1440))  # tail of a block past midnight
+
+    for start in range(earliest, latest - duration + 1, 15):
+        end = start + duration
+        if all(end <= s or start >= e for s, e in spans):
+            return start
+    return None
+
+
+def draft_schedule(events, min_sleep=8, prior=None):
+    """
+    Greedy first placement from an events dict
+    ({"Monday": [("Work", 8), ...], ...}): tasks back to back from 08:00 in
+    the order given, plus one sleep block per day at 21:00 (unless the user
+    listed Sleep themselves). Durations are rounded to 15 minutes.
+
+    With a prior week (warm start), events that match a prior block keep its
+    times, the prior sleep block is reused, and only the remaining events
+    are placed into the first free slots.
+    """
+    if prior is not None:
+        return _draft_from_prior(events, min_sleep, prior)
+
+    parsed = {}
+    for day in DAYS:
+        blocks = []
+        cursor = DAY_START
+        has_sleep = False
+
+        for activity, hours in events.get(day, []):
+            duration = _duration_min(hours)
+            if _is_sleep(activity):
+                has_sleep = True
+                start = DEFAULT_SLEEP_START
+            else:
+                start = cursor
+                cursor += duration
+            blocks.append((_to_hhmm(start), _to_hhmm(start + duration), activity))
+
+        if not has_sleep:
+            sleep_len = int(min_sleep * 60)
+            blocks.append((
+                _to_hhmm(DEFAULT_SLEEP_START),
+                _to_hhmm(DEFAULT_SLEEP_START + sleep_len),
+                "Sleep",
+            ))
+
+        parsed[day] = blocks
+    return parsed
+
+
+def _draft_from_prior(events, min_sleep, prior):
+    if isinstance(prior, str):
+        prior = parse_schedule_text(prior)
+
+    parsed = {}
+    for day in DAYS:
+        day_events = events.get(day, [])
+        kept, new_events, unused = _match_prior(day_events, prior.get(day, []))
+
+        if not any(_is_sleep(activity) for activity, _ in day_events):
+            prior_sleep = [b for b in unused if _is_sleep(b[2])]
+            if prior_sleep:
+                kept.append(prior_sleep[0])
+            else:
+                kept.append((
+                    _to_hhmm(DEFAULT_SLEEP_START),
+                    _to_hhmm(DEFAULT_SLEEP_START + int(min_sleep * 60)),
+                    "Sleep",
+                ))
+
+        occupied = [(_to_min(s), (_to_min(e) - _to_min(s)) % 1440) for s, e, _ in kept]
+        blocks = list(kept)
+
+        for activity, hours in new_events:
+            duration = _duration_min(hours)
+            start = first_free_slot(occupied, duration, DAY_START)
+            if start is None:
+                # no gap left; let the optimizer resolve the overlap
+                start = max((s + d for s, d in occupied if s + d <= 1440), default=DAY_START)
+                start = min(start, 1440 - 15)
+            occupied.append((start, duration))
+            blocks.append((_to_hhmm(start), _to_hhmm(start + duration), activity))
+
+        parsed[day] = sorted(blocks, key=lambda b: _to_min(b[0]))
+    return parsed
+
+
+def plan_week(events, min_sleep=8, iterations=5000, seed=0, prior=None):
+    """
+    Events dict -> optimized parsed schedule, with no LLM call.
+    prior: last week's accepted schedule to warm-start from.
+    """
+    draft = draft_schedule(events, min_sleep, prior)
+    return optimize_schedule(draft, min_sleep, iterations, seed, prior=prior)
+
+
+# -----------------------------------------------------------
+# Batch planning across processes
+# -----------------------------------------------------------
+
+def _plan_chunk(chunk, min_sleep, iterations, seed):
+    return [
+        (user_id, plan_week(events, min_sleep, iterations, seed))
+        for user_id, events in chunk
+    ]
+
+
+def optimize_many(users_events, min_sleep=8, iterations=5000, seed=0,
+                  max_workers=None, chunksize=32):
+    """
+    Plan many users' weeks in parallel and yield (user_id, parsed_schedule)
+    as each chunk finishes (completion order, not input order).
+
+    users_events: {user_id: events} or an iterable of (user_id, events).
+    Users are sent to workers in chunks of `chunksize` to amortize pickling,
+    and at most two chunks per worker are in flight, so huge inputs are
+    consumed lazily.
+    """
+    items = iter(users_events.items() if isinstance(users_events, dict) else users_events)
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = 2 * max_workers
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        pending = set()
+
+        def submit_next():
+            chunk = list(islice(items, chunksize))
+            if chunk:
+                pending.add(pool.submit(_plan_chunk, chunk, min_sleep, iterations, seed))
+            return bool(chunk)
+
+        while len(pending) < max_in_flight and submit_next():
+            pass
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+                submit_next()
@@ -9,10 +9,20 @@ Gathers real-time external data:
 
 This data feeds into the agent's OBSERVE step so
 it can modify schedules based on real-world events.
+
+Sources are fetched concurrently, each with its own deadline, so one
+slow API costs at most its timeout and never blocks the others.
+Successful results are cached per source and location; stale entries
+are served immediately while a background refresh runs. Requests go
+through the shared pooled client in http_client.
 """
 
-import requests
 import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from src.tools.http_client import get_json
+from src.tools.ttl_cache import TTLCache
 
 
 # -------------------------------------------------------
@@ -28,11 +38,33 @@ DEFAULT_LON = -104.8439
 DEFAULT_CITY = "Colorado Springs"
 DEFAULT_STATE = "CO"
 
+# Per-source deadlines in seconds (also passed to requests as timeout=)
+DEFAULT_TIMEOUT = 5.0
+SOURCE_TIMEOUTS = {
+    "news": 4.0,
+    "weather": 3.0,
+    "traffic": 4.0,
+}
+
+# Cache lifetimes in seconds: fresh for TTL, then served stale (while
+# refreshing in the background) for up to STALE more.
+CACHE_TTLS = {
+    "news": 15 * 60,
+    "weather": 10 * 60,
+    "traffic": 2 * 60,
+}
+CACHE_STALE = {
+    "news": 60 * 60,
+    "weather": 30 * 60,
+    "traffic": 5 * 60,
+}
+DEFAULT_CACHE_TTL = 5 * 60
+
 
 # -------------------------------------------------------
 # 1. NewsAPI – World & Local Events
 # -------------------------------------------------------
-def fetch_news(query="Colorado", max_results=5):
+def fetch_news(query="Colorado", max_results=5, timeout=DEFAULT_TIMEOUT):
     """
     Fetches top news stories relevant to local region or global breaking news.
     """
@@ -46,7 +78,7 @@ def fetch_news(query="Colorado", max_results=5):
     )
 
     try:
-        resp = requests.get(url).json()
+        resp = get_json(url, timeout=timeout)
         articles = resp.get("articles", [])
         headlines = [a["title"] for a in articles if "title" in a]
 
@@ -62,7 +94,7 @@ def fetch_news(query="Colorado", max_results=5):
 # -------------------------------------------------------
 # 2. Weather API – Current Conditions + Alerts
 # -------------------------------------------------------
-def fetch_weather(lat=DEFAULT_LAT, lon=DEFAULT_LON):
+def fetch_weather(lat=DEFAULT_LAT, lon=DEFAULT_LON, timeout=DEFAULT_TIMEOUT):
     """
     Gets current conditions + severe weather alerts from OpenWeatherMap.
     """
@@ -73,7 +105,7 @@ def fetch_weather(lat=DEFAULT_LAT, lon=DEFAULT_LON):
     )
 
     try:
-        resp = requests.get(url).json()
+        resp = get_json(url, timeout=timeout)
 
         current = resp.get("current", {})
         alerts = resp.get("alerts", [])
@@ -106,7 +138,7 @@ def fetch_weather(lat=DEFAULT_LAT, lon=DEFAULT_LON):
 # -------------------------------------------------------
 # 3. Google Maps Traffic API – Live Traffic Summary
 # -------------------------------------------------------
-def fetch_traffic(origin="USAFA", destination="Colorado Springs"):
+def fetch_traffic(origin="USAFA", destination="Colorado Springs", timeout=DEFAULT_TIMEOUT):
     """
     Estimate travel time + delays using Google Maps Distance Matrix API.
     """
@@ -119,7 +151,7 @@ def fetch_traffic(origin="USAFA", destination="Colorado Springs"):
     )
 
     try:
-        resp = requests.get(url).json()
+        resp = get_json(url, timeout=timeout)
 
         rows = resp.get("rows", [])
         if not rows:
@@ -143,14 +175,85 @@ def fetch_traffic(origin="USAFA", destination="Colorado Springs"):
 # -------------------------------------------------------
 # MASTER OBSERVER
 # -------------------------------------------------------
-def observe_world():
+# name -> fetch function; each must accept a timeout= keyword
+SOURCES = {
+    "news": fetch_news,
+    "weather": fetch_weather,
+    "traffic": fetch_traffic,
+}
+
+# Shared so repeated observations reuse threads
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="observer")
+
+# Shared by every user, so one location is fetched once per TTL
+CACHE = TTLCache()
+
+
+def register_source(name, fetch, timeout=DEFAULT_TIMEOUT, ttl=DEFAULT_CACHE_TTL, stale=0):
+    """Add an observation source; it is fetched alongside the others."""
+    SOURCES[name] = fetch
+    SOURCE_TIMEOUTS[name] = timeout
+    CACHE_TTLS[name] = ttl
+    CACHE_STALE[name] = stale
+
+
+def _cache_key(name, params):
+    # coordinates rounded to ~1 km so nearby users share an entry
+    return (name,) + tuple(sorted(
+        (k, round(v, 2) if isinstance(v, float) else v) for k, v in params.items()
+    ))
+
+
+def _is_ok(result):
+    return isinstance(result, dict) and result.get("status") == "ok"
+
+
+def _cached_fetch(name, params, timeout):
+    fetch = SOURCES[name]
+    return CACHE.get(
+        _cache_key(name, params),
+        lambda: fetch(timeout=timeout, **params),
+        ttl=CACHE_TTLS.get(name, DEFAULT_CACHE_TTL),
+        stale_ttl=CACHE_STALE.get(name, 0),
+        cacheable=_is_ok,
+    )
+
+
+def observe_world(sources=None, timeouts=None, params=None, use_cache=True):
     """
     Collects ALL external data sources and merges them
     into a single observation dict.
+
+    Sources run concurrently. A source that misses its deadline is
+    reported as {"status": "timeout"} and the rest are still returned.
+
+    params: per-source keyword arguments, e.g.
+            {"weather": {"lat": 39.7, "lon": -105.0}, "news": {"query": "Denver"}}
     """
-    return {
-        "timestamp": datetime.datetime.now().isoformat(),
-        "news": fetch_news(),
-        "weather": fetch_weather(),
-        "traffic": fetch_traffic(),
-    }
+    names = list(sources or SOURCES)
+    deadlines = dict(SOURCE_TIMEOUTS, **(timeouts or {}))
+    params = params or {}
+
+    started = time.monotonic()
+    futures = {}
+    for name in names:
+        timeout = deadlines.get(name, DEFAULT_TIMEOUT)
+        kwargs = params.get(name, {})
+        if use_cache:
+            futures[name] = _EXECUTOR.submit(_cached_fetch, name, kwargs, timeout)
+        else:
+            futures[name] = _EXECUTOR.submit(SOURCES[name], timeout=timeout, **kwargs)
+
+    observation = {"timestamp": datetime.datetime.now().isoformat()}
+    for name, future in futures.items():
+        limit = deadlines.get(name, DEFAULT_TIMEOUT)
+        remaining = max(0.0, started + limit - time.monotonic())
+        try:
+            observation[name] = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            future.cancel()
+            observation[name] = {"status": "timeout", "error": f"no response within {limit}s"}
+        except Exception as e:
+            observation[name] = {"status": "error", "error": str(e)}
+
+    return observation
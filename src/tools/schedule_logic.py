@@ -26,6 +26,7 @@ class ScheduleAgent:
         """Parse TinyLlama's text output and send events to Google Calendar."""
         lines = schedule_text.splitlines()
         current_day = None
+        blocks = []
 
         for line in lines:
             line = line.strip()
@@ -54,8 +55,14 @@ class ScheduleAgent:
                 start_time = datetime.datetime(target_date.year, target_date.month, target_date.day, 9)  # 9 AM start
                 end_time = start_time + datetime.timedelta(hours=hours)
 
-                # Add to Google Calendar!
-                self.calendar.create_event(task.strip(), start_time, end_time)
+                blocks.append((task.strip(), start_time, end_time))
+
+        # Only send the inserts/patches/deletes needed to match the calendar
+        today = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        result = self.calendar.sync_events(blocks, today, today + datetime.timedelta(days=7))
+        if result["errors"]:
+            print(f"{len(result['errors'])} calendar changes failed to sync.")
+        return result
 
     def generate_schedule(self, events):
         event_text = "\n".join(
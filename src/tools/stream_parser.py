@@ -0,0 +1,112 @@
+# src/tools/stream_parser.py
+
+"""
+Incremental schedule parser.
+
+Consumes decoded model text chunk by chunk (as it comes out of
+`generate`) and emits validated (day, start, end, activity) blocks
+as soon as each line is complete, so callers can render or
+post-process the schedule before decoding finishes.
+"""
+
+import re
+
+DAYS = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
+
+_DAY_LOOKUP = {d.lower(): d for d in DAYS}
+_BLOCK_RE = re.compile(r"^(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})-(.+)$")
+
+
+def parse_stream_line(line, current_day):
+    """
+    Classify one complete line.
+
+    Returns:
+        ("day", "Monday")                          for a day header
+        ("block", ("Monday", "07:00", "09:00", "Gym"))  for a valid block
+        None                                       for anything else
+    """
+    raw = line.strip()
+    if not raw:
+        return None
+
+    day = _DAY_LOOKUP.get(raw.rstrip(":").strip().lower())
+    if day:
+        return ("day", day)
+
+    if current_day is None:
+        return None
+
+    match = _BLOCK_RE.match(raw)
+    if not match:
+        return None
+
+    sh, sm, eh, em, activity = match.groups()
+    sh, sm, eh, em = int(sh), int(sm), int(eh), int(em)
+    if sh > 23 or eh > 23 or sm > 59 or em > 59:
+        return None
+
+    activity = activity.strip()
+    if not activity:
+        return None
+
+    return ("block", (current_day, f"{sh:02d}:{sm:02d}", f"{eh:02d}:{em:02d}", activity))
+
+
+class StreamingScheduleParser:
+    """
+    Feed text chunks with `feed()`; each call returns the blocks whose
+    lines were completed by that chunk. Call `close()` once the stream
+    ends to flush a trailing line that has no newline.
+
+    Example:
+        parser = StreamingScheduleParser()
+        for chunk in streamer:
+            for day, start, end, activity in parser.feed(chunk):
+                ...
+        parser.close()
+    """
+
+    def __init__(self):
+        self.current_day = None
+        self.blocks = []
+        self._buffer = ""
+
+    def feed(self, chunk):
+        if not chunk:
+            return []
+
+        self._buffer += chunk
+        if "\n" not in chunk:
+            return []
+
+        *complete, self._buffer = self._buffer.split("\n")
+        return self._consume(complete)
+
+    def close(self):
+        tail, self._buffer = self._buffer, ""
+        return self._consume([tail])
+
+    def _consume(self, lines):
+        emitted = []
+        for line in lines:
+            parsed = parse_stream_line(line, self.current_day)
+            if parsed is None:
+                continue
+
+            kind, value = parsed
+            if kind == "day":
+                self.current_day = value
+            else:
+                self.blocks.append(value)
+                emitted.append(value)
+
+        return emitted
+
+
+def iter_stream_blocks(chunks):
+    """Generator form: yields blocks from an iterable of text chunks."""
+    parser = StreamingScheduleParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
@@ -0,0 +1,171 @@
+# src/tools/team_availability.py
+
+"""
+Team common-free-time finder.
+
+Each user's week becomes a minute-resolution busy bitset
+(7 * 1440 minutes, Monday 00:00 = minute 0). Bitsets are built for all
+users at once with a difference array + cumulative sum, combined with
+vectorized AND/OR (or a per-minute free count for quorum queries), and
+scanned for free runs of the requested length.
+
+Schedules may be given as:
+    - schedule text                        (evaluator.extract_day_blocks)
+    - parsed {day: [(start, end, activity), ...]}
+    - dashboard.parse_blocks() rows        [{"Day", "Start", "End", "Activity"}, ...]
+"""
+
+import numpy as np
+
+from src.tools.evaluator import (
+    DAYS,
+    clock_to_minutes,
+    extract_day_blocks,
+    parse_block_minutes,
+)
+
+MINUTES_PER_DAY = 1440
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+DEFAULT_DAY_START = "08:00"
+DEFAULT_DAY_END = "22:00"
+
+_DAY_INDEX = {d: i for i, d in enumerate(DAYS)}
+
+
+# -----------------------------------------------------------
+# Schedule -> intervals
+# -----------------------------------------------------------
+
+def _iter_schedule_blocks(schedule):
+    """Yield (day_index, start_min, end_min) from any supported schedule form."""
+    if isinstance(schedule, str):
+        for day, blocks in extract_day_blocks(schedule).items():
+            for blk in blocks:
+                start, end, _ = parse_block_minutes(blk)
+                if start is not None:
+                    yield _DAY_INDEX[day], start, end
+        return
+
+    if isinstance(schedule, dict):
+        items = (
+            (day, start, end)
+            for day, blocks in schedule.items()
+            for start, end, *_ in blocks
+        )
+    else:
+        items = ((row["Day"], row["Start"], row["End"]) for row in schedule)
+
+    for day, start, end in items:
+        if day not in _DAY_INDEX:
+            continue
+        if isinstance(start, str):
+            start, end = clock_to_minutes(start.strip()), clock_to_minutes(end.strip())
+            if start is None or end is None:
+                continue
+        yield _DAY_INDEX[day], start, end
+
+
+def _interval_arrays(schedules):
+    """Flat (user, abs_start, abs_end) arrays; blocks past Sunday wrap to Monday."""
+    users, starts, ends = [], [], []
+    for u, schedule in enumerate(schedules):
+        for d, start, end in _iter_schedule_blocks(schedule):
+            abs_start = d * MINUTES_PER_DAY + start
+            users.append(u)
+            starts.append(abs_start)
+            ends.append(abs_start + (end - start) % MINUTES_PER_DAY)
+
+    users = np.asarray(users, dtype=np.int64)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+
+    spill = ends > MINUTES_PER_WEEK
+    if spill.any():
+        users = np.concatenate([users, users[spill]])
+        starts = np.concatenate([starts, np.zeros(spill.sum(), dtype=np.int64)])
+        ends = np.concatenate([np.minimum(ends, MINUTES_PER_WEEK), ends[spill] - MINUTES_PER_WEEK])
+
+    return users, starts, ends
+
+
+# -----------------------------------------------------------
+# Bitsets
+# -----------------------------------------------------------
+
+def busy_matrix(schedules):
+    """Boolean (n_users, 10080) matrix, True where the user is busy."""
+    schedules = list(schedules)
+    users, starts, ends = _interval_arrays(schedules)
+
+    diff = np.zeros((len(schedules), MINUTES_PER_WEEK + 1), dtype=np.int16)
+    np.add.at(diff, (users, starts), 1)
+    np.add.at(diff, (users, ends), -1)
+    return np.cumsum(diff[:, :-1], axis=1, dtype=np.int16) > 0
+
+
+def to_bitsets(busy):
+    """Pack a busy matrix into bytes (1260 bytes per user-week) for storage/caching."""
+    return np.packbits(busy, axis=1)
+
+
+def from_bitsets(bitsets):
+    return np.unpackbits(bitsets, axis=1, count=MINUTES_PER_WEEK).astype(bool)
+
+
+# -----------------------------------------------------------
+# Queries
+# -----------------------------------------------------------
+
+def _window_mask(day_start, day_end):
+    minute_of_day = np.arange(MINUTES_PER_WEEK) % MINUTES_PER_DAY
+    start, end = clock_to_minutes(day_start), clock_to_minutes(day_end)
+    if end <= start:
+        return (minute_of_day >= start) | (minute_of_day < end)
+    return (minute_of_day >= start) & (minute_of_day < end)
+
+
+def _runs(mask):
+    """(start, end) index pairs of consecutive True runs."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def common_free_windows(schedules=None, min_minutes=60, quorum=None,
+                        day_start=DEFAULT_DAY_START, day_end=DEFAULT_DAY_END,
+                        busy=None):
+    """
+    Free windows of at least `min_minutes` within [day_start, day_end).
+
+    quorum: minimum number of free users (default: everyone).
+    busy:   precomputed busy_matrix()/from_bitsets() result, to skip parsing.
+
+    Returns [(day, "HH:MM", "HH:MM", free_users), ...] where free_users is
+    the smallest number of free users at any minute of the window.
+    """
+    if busy is None:
+        busy = busy_matrix(schedules)
+    n = busy.shape[0]
+
+    free_count = n - busy.sum(axis=0, dtype=np.int32)
+    needed = n if quorum is None else quorum
+    ok = (free_count >= needed) & _window_mask(day_start, day_end)
+
+    windows = []
+    starts, ends = _runs(ok)
+    for s, e in zip(starts, ends):
+        # split runs that cross midnight so every window belongs to one day
+        while s < e:
+            day_end_abs = min(e, (s // MINUTES_PER_DAY + 1) * MINUTES_PER_DAY)
+            if day_end_abs - s >= min_minutes:
+                start_min = s % MINUTES_PER_DAY
+                end_min = start_min + (day_end_abs - s)
+                windows.append((
+                    DAYS[s // MINUTES_PER_DAY],
+                    f"{start_min // 60:02d}:{start_min % 60:02d}",
+                    f"{end_min // 60 % 24:02d}:{end_min % 60:02d}",
+                    int(free_count[s:day_end_abs].min()),
+                ))
+            s = day_end_abs
+
+    return windows
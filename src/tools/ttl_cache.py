@@ -0,0 +1,88 @@
+# src/tools/ttl_cache.py
+
+"""
+Thread-safe TTL cache with stale-while-revalidate.
+
+    value = cache.get(key, loader, ttl=300, stale_ttl=900)
+
+    age < ttl               -> cached value, no I/O
+    age < ttl + stale_ttl   -> cached value now, loader re-run in the background
+    otherwise / missing     -> loader runs in the calling thread
+
+Loads are single-flight: concurrent callers for the same key share one
+loader call instead of stampeding the upstream API. Loader exceptions
+propagate to the waiting callers and are never cached; results rejected
+by `cacheable` are returned but not stored.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class TTLCache:
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, refresh_workers=4):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()      # key -> (value, stored_at)
+        self._inflight = {}                # key -> Future
+        self._lock = threading.Lock()
+        # background refreshes get their own pool so a caller's pool can't deadlock
+        self._refresher = ThreadPoolExecutor(
+            max_workers=refresh_workers, thread_name_prefix="ttl-refresh"
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, key, loader, cacheable, future):
+        try:
+            value = loader()
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            if cacheable is None or cacheable(value):
+                self._store(key, value)
+            future.set_result(value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get(self, key, loader, ttl, stale_ttl=0.0, cacheable=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            age = time.monotonic() - entry[1] if entry is not None else None
+            if entry is not None and age < ttl:
+                return entry[0]
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if entry is not None and age < ttl + stale_ttl:
+            if owner:
+                self._refresher.submit(self._load, key, loader, cacheable, future)
+            return entry[0]
+
+        if owner:
+            self._load(key, loader, cacheable, future)
+        return future.result()
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
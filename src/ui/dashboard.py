@@ -6,10 +6,18 @@ import pandas as pd
 
 from src.agent.fair_weekly_agent import FairWeeklyAgent
 from src.tools.evaluator import evaluate_schedule
+from src.tools.history_analytics import activity_hours, blocks_frame, history_stats
+from src.tools.history_store import ScheduleHistoryStore
+from src.tools.ical import schedule_to_ics
 
 DAYS = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
 
 
+@st.cache_resource
+def get_history_store():
+    return ScheduleHistoryStore()
+
+
 def parse_blocks(schedule_text):
     """
     Parses lines like 'HH:MM-HH:MM-Activity' under each day header
@@ -50,12 +58,7 @@ def parse_blocks(schedule_text):
     return rows
 
 
-def main():
-    st.title("📅 AI Weekly Schedule Generator (FAIR-LLM + Phi-3.5)")
-
-    if "events" not in st.session_state:
-        st.session_state.events = {d: [] for d in DAYS}
-
+def render_generate(history, user_id):
     # ------------------------------------------------
     # Event input
     # ------------------------------------------------
@@ -85,15 +88,28 @@ def main():
     # ------------------------------------------------
     # Generate schedule
     # ------------------------------------------------
+    reuse_cached = st.checkbox(
+        "Reuse AI output for identical requests (last 24h)", value=False
+    )
     if st.button("Generate AI Schedule"):
         st.info("⏳ Running FAIR Weekly Agent...")
 
-        agent = FairWeeklyAgent(min_sleep=8)
+        agent = FairWeeklyAgent(min_sleep=8, response_cache=history if reuse_cached else None)
         agent.set_user_weekly_events(st.session_state.events)
+
+        previous = history.latest_run(user_id)
+        if previous:
+            agent.set_prior_schedule(previous["schedule_text"])
         schedule_text = agent.run_weekly_cycle()
 
         st.subheader("📄 Generated Schedule")
         st.text(schedule_text)
+        st.download_button(
+            "⬇️ Download as .ics",
+            schedule_to_ics(schedule_text),
+            file_name="weekly_schedule.ics",
+            mime="text/calendar",
+        )
 
         # --------------------------
         # Evaluation Metrics
@@ -105,6 +121,14 @@ def main():
             st.markdown(f"**{name.replace('_', ' ').title()}:**")
             st.json(info)
 
+        history.record_run(
+            user_id,
+            st.session_state.events,
+            schedule_text,
+            raw_output=agent.last_raw_output,
+            metrics=metrics,
+        )
+
         # --------------------------
         # Timeline visualization
         # --------------------------
@@ -136,5 +160,41 @@ def main():
             st.plotly_chart(fig, use_container_width=True)
 
 
+def render_history(history, user_id):
+    st.subheader("📚 Schedule History")
+
+    stats = history_stats(history, user_id=user_id)
+    if stats.empty:
+        st.info("No stored schedules for this user yet.")
+        return
+
+    stats = stats.set_index("week")
+    st.line_chart(stats[["sleep_hours", "rolling_sleep_hours"]])
+    st.line_chart(stats[["late_night_hours", "rolling_late_night_hours"]])
+    st.line_chart(stats[["task_completion_rate", "rolling_task_completion_rate"]])
+
+    hours = activity_hours(blocks_frame(history, user_id=user_id))
+    fig = px.bar(hours, x="week", y="hours", color="activity", title="Hours per Activity")
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.dataframe(stats)
+
+
+def main():
+    st.title("📅 AI Weekly Schedule Generator (FAIR-LLM + Phi-3.5)")
+
+    if "events" not in st.session_state:
+        st.session_state.events = {d: [] for d in DAYS}
+
+    user_id = st.sidebar.text_input("User", "default")
+    history = get_history_store()
+
+    tab_generate, tab_history = st.tabs(["Generate", "History"])
+    with tab_generate:
+        render_generate(history, user_id)
+    with tab_history:
+        render_history(history, user_id)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,66 @@
+# tests/test_batch_evaluator.py
+
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.tools.batch_evaluator import evaluate_many
+from src.tools.evaluator import DAYS, evaluate_schedule
+
+# letters only, so label matching and whole-line matching agree
+LABELS = ["Work", "Gym", "Study", "Lunch", "Sleep", "Read"]
+
+
+def random_schedule(rng):
+    lines = []
+    for day in rng.sample(DAYS, rng.randint(5, 7)) + rng.sample(DAYS, rng.randint(0, 2)):
+        lines.append(f"{day}:")
+        for _ in range(rng.randint(0, 6)):
+            start, end = rng.randrange(1440), rng.randrange(1440)
+            lines.append(f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}-{rng.choice(LABELS)}")
+        if rng.random() < 0.2:
+            lines.append("not a block")
+    return "\n".join(lines)
+
+
+def random_events(rng):
+    return {day: [(rng.choice(LABELS), 1)] for day in rng.sample(DAYS, 3)}
+
+
+def normalize(result):
+    """Float totals may differ in the last bits between the two summations."""
+    out = dict(result)
+    out["max_24_hours"] = dict(result["max_24_hours"], violations=[
+        (day, round(total, 9)) for day, total in result["max_24_hours"]["violations"]
+    ])
+    return out
+
+
+def test_matches_evaluate_schedule_on_duplicate_headers_and_rollover_sleep():
+    text = "\n".join([
+        "Monday:", "21:00-05:00-Sleep", "08:00-20:00-Work",
+        "Tuesday:", "22:00-04:00-Sleep",
+        "Monday:", "09:00-10:00-Gym", "10:00-23:30-Study", "12:00-23:00-Work",
+        "Wednesday:", "Thursday:", "Friday:", "Saturday:",
+    ])
+    events = {"Monday": [("Gym", 1), ("Work", 8)], "Tuesday": [("Read", 1)], "Sunday": [("Gym", 1)]}
+
+    expected = evaluate_schedule(text, events)
+
+    assert normalize(evaluate_many([text], events)[0]) == normalize(expected)
+    assert not expected["sleep_requirement"]["ok"]
+    assert not expected["max_24_hours"]["ok"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_evaluate_schedule_on_random_schedules(seed):
+    rng = random.Random(seed)
+    texts = [random_schedule(rng) for _ in range(200)]
+    events = [random_events(rng) for _ in texts]
+
+    batch = evaluate_many(texts, events)
+
+    for text, user_events, result in zip(texts, events, batch):
+        assert normalize(result) == normalize(evaluate_schedule(text, user_events))
@@ -0,0 +1,42 @@
+# tests/test_event_parser.py
+
+from datetime import date
+
+import pytest
+
+from src.tools.event_parser import iter_user_events, parse_recurring_line
+
+MONDAY = date(2026, 10, 19)
+
+GOOD = "Mon 8-10 Gym"
+BAD_RRULES = [
+    "RRULE:FREQ=WEEKLY;BYDAY=XX 9-10 Lab",
+    "RRULE:FREQ=WEEKLY;INTERVAL=0;BYDAY=MO 9-10 Lab",
+]
+
+
+@pytest.mark.parametrize("line", BAD_RRULES)
+def test_malformed_rrule_raises_value_error(line):
+    with pytest.raises(ValueError):
+        parse_recurring_line(line)
+
+
+@pytest.mark.parametrize("line", BAD_RRULES)
+def test_malformed_rrule_is_skipped_when_not_strict(line):
+    events = list(iter_user_events([line, GOOD], week_start=MONDAY))
+
+    assert events == [("Monday", "Gym", 2.0)]
+
+
+@pytest.mark.parametrize("line", BAD_RRULES)
+def test_malformed_rrule_is_reported_when_strict(line):
+    with pytest.raises(ValueError):
+        list(iter_user_events([line, GOOD], strict=True, week_start=MONDAY))
+
+
+def test_rrule_expands_for_the_requested_week():
+    events = list(iter_user_events(
+        ["RRULE:FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20261022 13-15 Lab"], week_start=MONDAY
+    ))
+
+    assert events == [("Tuesday", "Lab", 2.0), ("Thursday", "Lab", 2.0)]
@@ -0,0 +1,261 @@
+# tests/test_fake_calendar.py
+
+"""
+Calendar client paths exercised end-to-end against the in-process fake
+server: batch retries, diff sync, syncToken resync and freeBusy.
+"""
+
+import asyncio
+import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+
+from google.auth.credentials import AnonymousCredentials
+
+from src.tools.fake_calendar_server import FakeCalendarServer
+from src.tools.google_calendar_api import (
+    TIMEZONE,
+    CalendarEventCache,
+    GoogleCalendarService,
+)
+
+TZ = ZoneInfo(TIMEZONE)
+MONDAY = datetime.datetime(2026, 10, 19, tzinfo=TZ)
+
+
+def at(day, hour, minute=0):
+    return MONDAY + datetime.timedelta(days=day, hours=hour, minutes=minute)
+
+
+def block(summary, day, start_hour, hours):
+    start = at(day, start_hour)
+    return summary, start, start + datetime.timedelta(hours=hours)
+
+
+@pytest.fixture
+def server():
+    with FakeCalendarServer() as srv:
+        yield srv
+
+
+@pytest.fixture
+def calendar(server):
+    cal = GoogleCalendarService(root_url=server.root_url, credentials=AnonymousCredentials())
+    cal.authenticate()
+    return cal
+
+
+def stored(server, calendar_id="primary"):
+    events = server.store.calendars.get(calendar_id, {}).values()
+    return [e for e in events if e["status"] != "cancelled"]
+
+
+# -----------------------------------------------------------
+# Payload fidelity
+# -----------------------------------------------------------
+
+def test_naive_datetimes_come_back_with_an_offset(server, calendar):
+    naive = datetime.datetime(2026, 10, 19, 9, 0)
+
+    event = calendar.create_event("Gym", naive, naive + datetime.timedelta(hours=1))
+
+    assert event["start"] == {"dateTime": "2026-10-19T09:00:00-06:00", "timeZone": TIMEZONE}
+    assert event["end"]["dateTime"] == "2026-10-19T10:00:00-06:00"
+
+
+# -----------------------------------------------------------
+# create_events_batch
+# -----------------------------------------------------------
+
+def test_create_events_batch_uses_one_request_per_chunk(server, calendar):
+    events = [block(f"Task {i}", i % 7, 8, 1) for i in range(60)]
+
+    created, errors = calendar.create_events_batch(events, batch_size=50)
+
+    assert errors == {}
+    assert [e["summary"] for e in created] == [f"Task {i}" for i in range(60)]
+    assert server.request_count == 2
+    assert len(stored(server)) == 60
+
+
+def test_create_events_batch_retries_only_failed_items(server, calendar):
+    server.fail_next(2, status=503)
+
+    created, errors = calendar.create_events_batch(
+        [block("A", 0, 8, 1), block("B", 0, 10, 1), block("C", 0, 12, 1)], backoff=0.01
+    )
+
+    assert errors == {}
+    assert [e["summary"] for e in created] == ["A", "B", "C"]
+    assert server.call_count == 5            # 3 items + 2 retried
+    assert len(stored(server)) == 3
+
+
+def test_create_events_batch_does_not_retry_permanent_errors(server, calendar):
+    server.fail_next(1, status=404)
+
+    created, errors = calendar.create_events_batch(
+        [block("A", 0, 8, 1), block("B", 0, 10, 1)], backoff=0.01
+    )
+
+    assert created[0] is None and created[1]["summary"] == "B"
+    assert list(errors) == [0]
+    assert errors[0].resp.status == 404
+    assert server.call_count == 2
+
+
+def test_create_events_batch_gives_up_after_max_retries(server, calendar):
+    server.fail_next(3, status=429)
+
+    created, errors = calendar.create_events_batch([block("A", 0, 8, 1)], max_retries=2, backoff=0.01)
+
+    assert created == [None]
+    assert errors[0].resp.status == 429
+    assert stored(server) == []
+
+
+# -----------------------------------------------------------
+# sync_events
+# -----------------------------------------------------------
+
+WEEK = (MONDAY, MONDAY + datetime.timedelta(days=7))
+
+
+def test_sync_events_second_run_is_a_no_op(server, calendar):
+    plan = [block("Gym", 0, 7, 1), block("Work", 0, 9, 8), block("Work", 1, 9, 8)]
+
+    first = calendar.sync_events(plan, *WEEK)
+    writes = server.call_count
+    second = calendar.sync_events(plan, *WEEK)
+
+    assert first["inserted"] == 3
+    assert second == {"inserted": 0, "patched": 0, "deleted": 0, "unchanged": 3, "errors": {}}
+    assert server.call_count == writes + 1   # only the list call
+
+
+def test_sync_events_patches_moved_blocks_and_deletes_removed_ones(server, calendar):
+    calendar.sync_events([block("Gym", 0, 7, 1), block("Work", 0, 9, 8), block("Study", 2, 19, 2)], *WEEK)
+
+    result = calendar.sync_events([block("Gym", 0, 6, 1), block("Work", 0, 9, 8), block("Read", 3, 20, 1)], *WEEK)
+
+    assert result == {"inserted": 1, "patched": 1, "deleted": 1, "unchanged": 1, "errors": {}}
+    by_summary = {e["summary"]: e for e in stored(server)}
+    assert sorted(by_summary) == ["Gym", "Read", "Work"]
+    assert datetime.datetime.fromisoformat(by_summary["Gym"]["start"]["dateTime"]).hour == 6
+
+
+def test_sync_events_leaves_unmanaged_events_alone(server, calendar):
+    calendar.create_event("Dentist", at(1, 14), at(1, 15))
+
+    result = calendar.sync_events([block("Gym", 0, 7, 1)], *WEEK)
+
+    assert result["deleted"] == 0
+    assert sorted(e["summary"] for e in stored(server)) == ["Dentist", "Gym"]
+
+
+# -----------------------------------------------------------
+# CalendarEventCache
+# -----------------------------------------------------------
+
+def test_event_cache_applies_incremental_changes(server, calendar):
+    gym = calendar.create_event("Gym", at(0, 7), at(0, 8))
+    cache = CalendarEventCache(calendar, min_interval=0)
+    cache.refresh()
+
+    calendar.create_event("Work", at(0, 9), at(0, 17))
+    calendar.service.events().delete(calendarId="primary", eventId=gym["id"]).execute()
+    cache.refresh()
+
+    assert [e["summary"] for e in cache.events_between(*WEEK, refresh=False)] == ["Work"]
+
+
+def test_event_cache_full_resync_after_410(server, calendar):
+    calendar.create_event("Gym", at(0, 7), at(0, 8))
+    cache = CalendarEventCache(calendar, min_interval=0)
+    cache.refresh()
+    old_token = cache.sync_token
+
+    calendar.create_event("Work", at(0, 9), at(0, 17))
+    server.store.expire_sync_tokens()
+    calls = server.call_count
+    cache.refresh()
+
+    assert server.call_count == calls + 2    # 410 on the token, then a full list
+    assert cache.sync_token != old_token
+    assert [e["summary"] for e in cache.events_between(*WEEK, refresh=False)] == ["Gym", "Work"]
+
+
+def test_event_cache_skips_refreshes_inside_min_interval(server, calendar):
+    cache = CalendarEventCache(calendar, min_interval=3600)
+    cache.refresh()
+    calls = server.call_count
+
+    cache.events_between(*WEEK)
+
+    assert server.call_count == calls
+
+
+# -----------------------------------------------------------
+# query_free_busy
+# -----------------------------------------------------------
+
+def test_query_free_busy_merges_intervals_and_reports_missing_calendars(server, calendar):
+    for cal_id, (start, end) in [("alice", (9, 11)), ("alice", (10, 12)), ("bob", (14, 15))]:
+        server.store.insert(cal_id, {
+            "summary": "Busy",
+            "start": {"dateTime": at(0, start).isoformat()},
+            "end": {"dateTime": at(0, end).isoformat()},
+        })
+
+    busy, errors = calendar.query_free_busy(["alice", "bob", "nobody"], *WEEK)
+
+    assert busy["alice"] == [(at(0, 9), at(0, 12))]
+    assert busy["bob"] == [(at(0, 14), at(0, 15))]
+    assert busy["nobody"] == []
+    assert [e["reason"] for e in errors["nobody"]] == ["notFound"]
+    assert set(errors) == {"nobody"}
+
+
+def test_query_free_busy_chunks_calendars_into_one_batch(server, calendar):
+    ids = [f"user{i}" for i in range(120)]
+    for cal_id in ids:
+        server.store.insert(cal_id, {
+            "summary": "Busy",
+            "start": {"dateTime": at(1, 9).isoformat()},
+            "end": {"dateTime": at(1, 10).isoformat()},
+        })
+
+    busy, errors = calendar.query_free_busy(ids, *WEEK)
+
+    assert errors == {}
+    assert all(busy[cal_id] == [(at(1, 9), at(1, 10))] for cal_id in ids)
+    assert server.call_count == 3            # 50 + 50 + 20 calendars
+    assert server.request_count == 1
+
+
+# -----------------------------------------------------------
+# Async client
+# -----------------------------------------------------------
+
+def test_sync_users_inserts_every_users_events_concurrently(server):
+    pytest.importorskip("httpx")
+    from src.tools.async_calendar import sync_users
+
+    user_events = {
+        f"user{u}": (f"token-{u}", [
+            {"summary": f"Task {i}",
+             "start": {"dateTime": at(i % 7, 8).isoformat()},
+             "end": {"dateTime": at(i % 7, 9).isoformat()}}
+            for i in range(5)
+        ])
+        for u in range(20)
+    }
+
+    results = asyncio.run(sync_users(user_events, base_url=server.base_url,
+                                     rate=1000, burst=10, max_connections=10))
+
+    assert all(not isinstance(r, Exception) for rs in results.values() for r in rs)
+    assert len(stored(server)) == 100
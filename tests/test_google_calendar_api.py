@@ -0,0 +1,31 @@
+# tests/test_google_calendar_api.py
+
+import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+
+from src.tools.google_calendar_api import _event_start, event_body
+
+
+def test_event_start_reads_naive_datetime_in_event_timezone():
+    start = datetime.datetime(2026, 10, 19, 9, 0)
+    body = event_body("Gym", start, start + datetime.timedelta(hours=1), "Europe/Berlin")
+
+    assert _event_start(body) == start.replace(tzinfo=ZoneInfo("Europe/Berlin"))
+
+
+def test_event_start_keeps_explicit_offset():
+    event = {"start": {"dateTime": "2026-10-19T09:00:00Z", "timeZone": "Europe/Berlin"}}
+
+    assert _event_start(event) == datetime.datetime(2026, 10, 19, 9, 0, tzinfo=datetime.timezone.utc)
+
+
+def test_event_start_all_day_is_local_midnight():
+    event = {"start": {"date": "2026-10-19"}}
+
+    assert _event_start(event, "America/Denver") == datetime.datetime(
+        2026, 10, 19, tzinfo=ZoneInfo("America/Denver")
+    )
@@ -0,0 +1,40 @@
+# tests/test_horizon_planner.py
+
+import datetime
+
+from src.tools.horizon_planner import HorizonPlanner
+
+WEDNESDAY = datetime.date(2026, 8, 19)
+
+
+def labels(week, day):
+    return [label for _, _, label in week["schedule"][day]]
+
+
+def test_nothing_is_placed_before_a_midweek_start_date():
+    planner = HorizonPlanner(WEDNESDAY, 3)
+    planner.add_recurring(["Mon", "Wed"], "08:00", "09:00", "Gym")
+    planner.add_rule("every day 07:00-07:30 Run")
+    planner.add_weekly_events({"Monday": [("Study", 2)], "Tuesday": [("Study", 2)]})
+    planner.add_event(datetime.date(2026, 8, 18), "10:00", "11:00", "Dentist")
+    planner.add_deadline("Paper", 2, datetime.date(2026, 8, 28))
+
+    first, second = planner.plan()[:2]
+
+    assert first["week_start"] == datetime.date(2026, 8, 17)
+    assert first["schedule"]["Monday"] == []
+    assert first["schedule"]["Tuesday"] == []
+    assert first["unplaced"] == []
+    assert labels(first, "Wednesday") == ["Run", "Gym", "Paper", "Sleep"]
+    assert labels(second, "Monday") == ["Run", "Gym", "Study", "Sleep"]
+
+
+def test_deadline_work_defaults_to_start_date_not_its_monday():
+    planner = HorizonPlanner(WEDNESDAY, 1)
+    planner.add_deadline("Paper", 6, datetime.date(2026, 8, 23), chunk_hours=2)
+
+    week = planner.plan()[0]
+
+    days = [day for day, blocks in week["schedule"].items()
+            if any(label == "Paper" for _, _, label in blocks)]
+    assert days == ["Wednesday", "Thursday", "Friday"]
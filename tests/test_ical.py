@@ -0,0 +1,83 @@
+# tests/test_ical.py
+
+import datetime
+
+from src.tools.event_parser import load_ics_file
+from src.tools.ical import iter_ics_events, parse_ics_datetime
+
+MONDAY = datetime.date(2026, 10, 19)
+
+
+def vcalendar(*events):
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for props in events:
+        lines += ["BEGIN:VEVENT", *props, "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    return [line + "\r\n" for line in lines]
+
+
+def week(week_start=MONDAY):
+    start = datetime.datetime.combine(week_start, datetime.time())
+    return start, start + datetime.timedelta(days=7)
+
+
+def test_utc_times_convert_to_the_planner_timezone_not_the_hosts():
+    assert parse_ics_datetime("20261019T140000Z") == datetime.datetime(2026, 10, 19, 8, 0)
+    assert parse_ics_datetime("20261019T140000Z", timezone="Europe/Berlin") == \
+        datetime.datetime(2026, 10, 19, 16, 0)
+
+
+def test_tzid_times_convert_to_the_planner_timezone():
+    params = {"TZID": "America/New_York"}
+
+    assert parse_ics_datetime("20261019T100000", params) == datetime.datetime(2026, 10, 19, 8, 0)
+
+
+def test_unknown_tzid_and_floating_times_are_kept_as_is():
+    assert parse_ics_datetime("20261019T100000", {"TZID": "Eastern Standard Time"}) == \
+        datetime.datetime(2026, 10, 19, 10, 0)
+    assert parse_ics_datetime("20261019T100000") == datetime.datetime(2026, 10, 19, 10, 0)
+
+
+def test_weekly_rrule_is_expanded_in_later_weeks():
+    ics = vcalendar([
+        "SUMMARY:Lecture",
+        "DTSTART;TZID=America/New_York:20260907T110000",
+        "DTEND;TZID=America/New_York:20260907T123000",
+        "RRULE:FREQ=WEEKLY;BYDAY=MO,WE",
+    ])
+
+    events = list(iter_ics_events(ics, *week()))
+
+    assert events == [
+        (datetime.datetime(2026, 10, 19, 9, 0), datetime.datetime(2026, 10, 19, 10, 30), "Lecture"),
+        (datetime.datetime(2026, 10, 21, 9, 0), datetime.datetime(2026, 10, 21, 10, 30), "Lecture"),
+    ]
+
+
+def test_rrule_until_and_count_end_the_series():
+    ics = vcalendar(
+        ["SUMMARY:Until", "DTSTART:20261005T080000", "DTEND:20261005T090000",
+         "RRULE:FREQ=WEEKLY;UNTIL=20261012T235959Z"],
+        ["SUMMARY:Count", "DTSTART:20261013T080000", "DTEND:20261013T090000",
+         "RRULE:FREQ=DAILY;COUNT=8"],
+    )
+
+    events = list(iter_ics_events(ics, *week()))
+
+    assert [(e[0].day, e[2]) for e in events] == [(19, "Count"), (20, "Count")]
+
+
+def test_load_ics_file_fills_each_week_of_a_recurring_event(tmp_path):
+    path = tmp_path / "classes.ics"
+    path.write_text("".join(vcalendar([
+        "SUMMARY:Gym",
+        "DTSTART:20260902T130000Z",
+        "DTEND:20260902T140000Z",
+        "RRULE:FREQ=WEEKLY",
+    ])), encoding="utf-8")
+
+    for week_start in (MONDAY, MONDAY + datetime.timedelta(days=7)):
+        events = load_ics_file(str(path), week_start)
+        assert events["Wednesday"] == [("Gym", 1.0)]
+        assert sum(len(v) for v in events.values()) == 1
@@ -0,0 +1,59 @@
+# tests/test_optimizer.py
+
+import random
+
+import pytest
+
+from src.tools.optimizer import (
+    DAYS,
+    _move_delta,
+    _propose,
+    _to_hhmm,
+    _to_week,
+    optimize_schedule,
+    schedule_cost,
+    week_cost,
+)
+
+LABELS = ["Work", "Gym", "Study", "Lunch", "Read", "Call"]
+
+
+def messy_draft(rng):
+    """Random overlapping, fragmented blocks plus an 8h sleep every day."""
+    draft = {}
+    for day in DAYS:
+        blocks = []
+        for _ in range(rng.randint(2, 7)):
+            start = rng.randrange(0, 1440, 15)
+            length = rng.choice((15, 30, 45, 60, 90, 120, 240))
+            blocks.append((_to_hhmm(start), _to_hhmm(start + length), rng.choice(LABELS)))
+        sleep = rng.randrange(19 * 60, 25 * 60, 30)
+        blocks.append((_to_hhmm(sleep), _to_hhmm(sleep + 480), "Sleep"))
+        draft[day] = blocks
+    return draft
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_incremental_delta_matches_full_rescore(seed):
+    rng = random.Random(seed)
+    week = _to_week(messy_draft(rng), min_sleep=8)
+    cost = week_cost(week)
+
+    for _ in range(200):
+        move = _propose(week, rng, fixed=set(), pinned=set())
+        if move is None:
+            continue
+        day_idx, removed, added = move
+        cost += _move_delta(week, day_idx, removed, added)
+        week[day_idx] = [b for b in week[day_idx] if not any(b is r for r in removed)] + added
+
+        assert cost == pytest.approx(week_cost(week), abs=1e-6)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_optimize_schedule_never_raises_cost(seed):
+    draft = messy_draft(random.Random(seed))
+
+    optimized = optimize_schedule(draft, iterations=2000, seed=seed)
+
+    assert schedule_cost(optimized) <= schedule_cost(draft) + 1e-6